@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Download Pakistan Code PDFs from a URL queue into a content-addressed store.
+
+- Input: download_log.csv (pdf_url column), a text file of URLs (one per
+  line, e.g. downloaded_urls.txt), or local folders to import (--import-dir)
+- Bounded concurrency over one pooled requests session
+- Partial downloads live in <store>/.partial and resume with HTTP Range +
+  If-Range (the ETag / Last-Modified the partial started with), so a file
+  that changed on the server is refetched whole, never spliced
+- Finished files are moved into place atomically and stored once per
+  SHA-256: <store>/<sha[:2]>/<sha>.pdf
+- <store>/manifest.jsonl maps url → sha256/size (append-only, replayed on start)
+- --link-dir recreates the flat <basename>.pdf folder the text extractor
+  reads, as hard links into the store (copies where links are unsupported)
+- --refresh re-checks stored URLs with conditional requests (If-None-Match /
+  If-Modified-Since from the ETag / Last-Modified saved per URL); only new
+  or changed PDFs are re-downloaded, relinked and listed in --report for
+  the extract → parse → index stages
+
+Usage:
+    python scrape_pakistancode_all_categories_v3.py --skip-download   # discover only
+    python download_pdfs.py download_log.csv --workers 8 --link-dir pakistan_code_pdfs
+    python download_pdfs.py --import-dir pakistan_code_pdfs --import-dir pakistan_code_pdfs_old
+    python download_pdfs.py download_log.csv --refresh --link-dir pakistan_code_pdfs   # weekly
+
+Requires: requests
+"""
+
+import os
+import csv
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# ========= DEFAULTS =========
+DEFAULT_STORE = "pakistan_code_pdf_store"
+DEFAULT_REPORT = "refresh_report.json"
+DEFAULT_WORKERS = 4
+TIMEOUT = 90
+CHUNK = 1 << 16
+UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+# ============================
+
+
+def url_key(url):
+    """Stable across runs (unlike hash(), which is salted per process)."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def read_urls(path):
+    """PDF URLs from download_log.csv or a plain list, in order, without repeats."""
+    urls = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            urls = [r["pdf_url"].strip() for r in csv.DictReader(f) if (r.get("pdf_url") or "").strip()]
+        else:
+            urls = [ln.strip() for ln in f if ln.strip() and not ln.startswith("#")]
+    return list(dict.fromkeys(urls))
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PdfStore:
+    """Content-addressed PDF folder plus a url → sha256 manifest."""
+
+    def __init__(self, root):
+        self.root = root
+        self.partial = os.path.join(root, ".partial")
+        os.makedirs(self.partial, exist_ok=True)
+        self.manifest_path = os.path.join(root, "manifest.jsonl")
+        self.entries = {}
+        self.lock = threading.Lock()
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                for ln in f:
+                    try:
+                        e = json.loads(ln)
+                    except ValueError:
+                        continue  # torn last line
+                    self.entries[e["url"]] = e
+
+    def path_for(self, sha):
+        return os.path.join(self.root, sha[:2], f"{sha}.pdf")
+
+    def has(self, url):
+        e = self.entries.get(url)
+        return e is not None and os.path.exists(self.path_for(e["sha256"]))
+
+    def partial_path(self, url):
+        return os.path.join(self.partial, f"{url_key(url)}.part")
+
+    def commit(self, url, tmp_path, sha, **extra):
+        """Move a finished temp file into the store (or drop it if the content is known)."""
+        final = self.path_for(sha)
+        with self.lock:
+            dup = os.path.exists(final)
+            if dup:
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                os.replace(tmp_path, final)
+            entry = {"url": url, "sha256": sha, "size": os.path.getsize(final),
+                     "name": os.path.basename(urlparse(url).path) or f"{url_key(url)}.pdf",
+                     "fetched": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra}
+            self.entries[url] = entry
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return final, dup
+
+    def link_into(self, out_dir, urls=None):
+        """
+        Flat <name>.pdf view of the store (hard links, copies as fallback).
+        With `urls`, only those entries are refreshed (and always replaced
+        unless already linked to the current content).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        made = 0
+        entries = self.entries.values() if urls is None else [self.entries[u] for u in urls if u in self.entries]
+        for e in entries:
+            dst = os.path.join(out_dir, e["name"])
+            src = self.path_for(e["sha256"])
+            if os.path.exists(dst) and (os.path.samefile(dst, src) or
+                                        (urls is None and os.path.getsize(dst) == e["size"])):
+                continue
+            tmp = dst + ".tmp"
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+            made += 1
+        return made
+
+
+def new_session(workers):
+    s = requests.Session()
+    s.headers.update({"User-Agent": UA})
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 10))
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def fetch(session, store, url, conditional=False):
+    """
+    Download one URL into the store. Returns (status, path, bytes_transferred)
+    with status in downloaded / resumed / duplicate for first fetches and
+    not_modified / unchanged / changed when `conditional` re-checks a stored URL.
+    """
+    prev = store.entries.get(url) if conditional else None
+    part = store.partial_path(url)
+    vpath = part + ".validators"  # ETag / Last-Modified of the response the partial came from
+    have = os.path.getsize(part) if os.path.exists(part) else 0
+    try:
+        started = json.load(open(vpath, encoding="utf-8")) if have else {}
+    except (OSError, ValueError):
+        started = {}
+    etag = started.get("etag")
+    if_range = etag if etag and not etag.startswith("W/") else started.get("last_modified")
+    if have and not if_range:
+        have = 0  # can't prove the partial is the same file: start over
+    headers = {}
+    if have:
+        headers["Range"] = f"bytes={have}-"
+        headers["If-Range"] = if_range
+    elif prev:
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            headers["If-Modified-Since"] = prev["last_modified"]
+
+    validators = {k: v for k, v in started.items() if have and v}
+    with session.get(url, stream=True, timeout=TIMEOUT, headers=headers) as r:
+        if r.status_code == 304:
+            return "not_modified", store.path_for(prev["sha256"]), 0
+        if r.status_code == 416:  # partial already holds the whole file
+            r.close()
+        else:
+            r.raise_for_status()
+            if r.status_code != 206:
+                have = 0  # full body (file changed, or Range ignored): discard the partial
+                validators = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+                with open(vpath, "w", encoding="utf-8") as f:
+                    json.dump(validators, f)
+            with open(part, "ab" if have else "wb") as f:
+                for chunk in r.iter_content(CHUNK):
+                    if chunk:
+                        f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+    size = os.path.getsize(part)
+    sha = sha256_file(part)
+    final, dup = store.commit(url, part, sha, **validators)
+    if os.path.exists(vpath):
+        os.remove(vpath)
+    if prev:
+        status = "unchanged" if sha == prev["sha256"] else "changed"
+    else:
+        status = "duplicate" if dup else ("resumed" if have else "downloaded")
+    return status, final, size - have
+
+
+def import_dir(store, folder):
+    """Add local PDFs to the store (keyed by file:// URL); identical files are kept once."""
+    counts = {"added": 0, "duplicate": 0}
+    for name in sorted(os.listdir(folder)):
+        src = os.path.join(folder, name)
+        if not name.lower().endswith(".pdf") or not os.path.isfile(src):
+            continue
+        url = "file://" + os.path.abspath(src).replace("\\", "/")
+        if store.has(url):
+            continue
+        tmp = os.path.join(store.partial, f"{url_key(url)}.import")
+        shutil.copyfile(src, tmp)
+        _, dup = store.commit(url, tmp, sha256_file(tmp), name=name)
+        counts["duplicate" if dup else "added"] += 1
+    return counts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent, resumable, content-addressed PDF downloader.")
+    ap.add_argument("queue", nargs="?", help="download_log.csv or a text file of PDF URLs")
+    ap.add_argument("--store", default=DEFAULT_STORE, help="Content-addressed store folder")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel downloads")
+    ap.add_argument("--import-dir", action="append", default=[], help="Local PDF folder to add to the store")
+    ap.add_argument("--link-dir", default="", help="Refresh a flat <name>.pdf folder from the store")
+    ap.add_argument("--refresh", action="store_true", help="Re-check stored URLs with conditional requests")
+    ap.add_argument("--report", default=DEFAULT_REPORT, help="Where --refresh writes what changed")
+    args = ap.parse_args()
+
+    store = PdfStore(args.store)
+
+    for folder in args.import_dir:
+        c = import_dir(store, folder)
+        print(f"📥 {folder}: {c['added']} added, {c['duplicate']} already stored (same SHA-256)")
+
+    fresh = None  # URLs whose content is new or changed in this run
+    if args.queue:
+        urls = read_urls(args.queue)
+        stored = {u for u in urls if store.has(u)}
+        todo = urls if args.refresh else [u for u in urls if u not in stored]
+        print(f"📋 {len(urls)} URLs • {len(stored)} already stored • {len(todo)} to "
+              f"{'check' if args.refresh else 'fetch'}")
+
+        session = new_session(args.workers)
+        stats = {k: 0 for k in ("downloaded", "resumed", "duplicate", "not_modified", "unchanged", "changed", "error")}
+        results = []
+        transferred = 0
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            old = {u: store.entries[u]["sha256"] for u in stored}
+            futures = {pool.submit(fetch, session, store, u, u in stored): u for u in todo}
+            for n, fut in enumerate(as_completed(futures), 1):
+                url = futures[fut]
+                try:
+                    status, _, nbytes = fut.result()
+                    transferred += nbytes
+                except Exception as e:
+                    status = "error"
+                    print(f"  ⚠️ {url}: {e}")
+                stats[status] += 1
+                results.append((url, status))
+                if n % 50 == 0 or n == len(todo):
+                    print(f"  [{n}/{len(todo)}] {({k: v for k, v in stats.items() if v})}")
+        elapsed = time.perf_counter() - t0
+        print(f"⏱️ {elapsed:.1f}s • {transferred / 1e6:.1f} MB transferred "
+              f"({transferred / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+
+        fresh = [u for u, st in results if st in ("downloaded", "resumed", "duplicate", "changed")]
+        if args.refresh:
+            entry = lambda u: {"url": u, "name": store.entries[u]["name"], "sha256": store.entries[u]["sha256"]}
+            report = {
+                "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "checked": len(todo),
+                "seconds": round(elapsed, 1),
+                "bytes_transferred": transferred,
+                "new": [entry(u) for u, st in results if st in ("downloaded", "resumed", "duplicate")],
+                "changed": [{**entry(u), "old_sha256": old[u]} for u, st in results if st == "changed"],
+                "not_modified": stats["not_modified"],
+                "unchanged": stats["unchanged"],  # 200 but same bytes (server sent no validators)
+                "errors": [u for u, st in results if st == "error"],
+            }
+            with open(args.report + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            os.replace(args.report + ".tmp", args.report)
+            print(f"🔄 Refresh: {len(report['new'])} new • {len(report['changed'])} changed • "
+                  f"{report['not_modified']} not modified • {report['unchanged']} unchanged • "
+                  f"{len(report['errors'])} errors → {args.report}")
+            for e in report["changed"]:
+                print(f"  ✏️ {e['name']}")
+
+    if args.link_dir:
+        n = store.link_into(args.link_dir, urls=fresh if args.refresh else None)
+        print(f"🔗 {n} files linked into {args.link_dir}")
+
+    shas = {e["sha256"] for e in store.entries.values()}
+    print(f"✅ Store: {len(store.entries)} sources → {len(shas)} unique PDFs in {os.path.abspath(args.store)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local mock of the Pakistan Code (English) site for testing the scrapers.
+
+Pages are built from what earlier crawls captured:
+- Categories page  → debug_categories.html as-is
+- Category listing → debug_listing.html with its accordion rewritten to the
+                     Acts download_log.csv records for that catid
+- Act page         → small page with a "Print/Download" tab whose #download
+                     pane links the Act's pdffiles/administrator<hash>.pdf
+                     (with --js-only F, a fixed fraction F of Acts only
+                     insert that link from JavaScript, to exercise the
+                     scraper's browser fallback)
+- PDFs             → served from pakistan_code_pdfs/ when present, else a
+                     small placeholder; Acts logged as 404 stay 404;
+                     "Range: bytes=N-" requests get 206 partial content;
+                     ETag / Last-Modified with 304 for conditional GETs
+                     (--amended F appends an amendment to a fixed fraction
+                     F of PDFs, changing their content and ETag)
+
+Usage:
+    python mock_pakistancode.py --port 8765 --latency 200
+    python scrape_pakistancode_all_categories_v3.py --fetch http --workers 8 --rate 0 \
+        --categories-url http://127.0.0.1:8765/english/LGu0xVD.php --out /tmp/pdfs
+"""
+
+import os
+import re
+import csv
+import copy
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, unquote
+
+from bs4 import BeautifulSoup
+
+
+# ========= DEFAULTS =========
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CATEGORIES_HTML = os.path.join(ROOT, "debug_categories.html")
+LISTING_HTML = os.path.join(ROOT, "debug_listing.html")
+LOG_CSV = os.path.join(ROOT, "download_log.csv")
+PDF_DIR = os.path.join(ROOT, "pakistan_code_pdfs")
+CATEGORIES_PATH = "/english/LGu0xVD.php"
+# ============================
+
+
+ACT_PAGE = """<!DOCTYPE html>
+<html><head><title>Pakistan Code</title></head>
+<body>
+<h3>{title}</h3>
+<ul class="nav nav-pills" id="pills-tab">
+  <li><a id="pills-home-tab" href="#home">Details</a></li>
+  <li><a id="pills-profile-tab" href="#download">Print/Download</a></li>
+</ul>
+<div class="tab-content">
+  <div class="tab-pane active" id="home"><p>{category}</p></div>
+  <div class="tab-pane" id="download">{download}</div>
+</div>
+{script}
+</body></html>
+"""
+JS_LINK = """<script>
+document.getElementById("download").innerHTML = '<a href="/pdf' + 'files/{pdf}">Download PDF</a>';
+</script>"""
+
+
+def act_key(act_url):
+    """Last path segment of an Act URL (what listing pages link to)."""
+    return unquote(urlparse(act_url).path.rsplit("/", 1)[-1])
+
+
+class MockSite:
+    def __init__(self, latency_ms=0, js_only=0.0, amended=0.0):
+        self.latency = latency_ms / 1000.0
+        self.js_only = js_only
+        self.amended = amended
+        self.categories_html = open(CATEGORIES_HTML, encoding="utf-8").read()
+        self.listing_html = open(LISTING_HTML, encoding="utf-8").read()
+        self.acts = {}     # act key → row
+        self.by_cat = {}   # catid → [row]
+        with open(LOG_CSV, encoding="utf-8", newline="") as f:
+            for r in csv.DictReader(f):
+                if not (r.get("category_id") or "").isdigit() or not r.get("act_url"):
+                    continue
+                key = act_key(r["act_url"])
+                self.acts.setdefault(key, r)
+                self.by_cat.setdefault(int(r["category_id"]), []).append(r)
+        self.pdfs = {os.path.basename(urlparse(r["pdf_url"]).path): r
+                     for r in self.acts.values() if r.get("pdf_url")}
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    def count(self, kind):
+        with self.lock:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+
+    def listing(self, cat_id):
+        soup = BeautifulSoup(self.listing_html, "html.parser")
+        sections = soup.select(".accordion")
+        if not sections:
+            return str(soup)
+        template, parent = sections[0], sections[0].parent
+        for s in sections:
+            s.extract()
+        for r in self.by_cat.get(cat_id, []):
+            block = copy.copy(template)
+            a = block.select_one(".accordion-section-title a[href]")
+            a["href"] = urlparse(r["act_url"]).path.rsplit("/", 1)[-1]
+            a.string = r["act_title"]
+            parent.append(block)
+        return str(soup)
+
+    @staticmethod
+    def picked(key, salt, fraction):
+        """Deterministic `fraction` of keys (same choice on every run)."""
+        return int(hashlib.md5((salt + key).encode()).hexdigest()[:8], 16) / 2**32 < fraction
+
+    def needs_js(self, key):
+        return self.picked(key, "js", self.js_only)
+
+    def act_page(self, key, row):
+        pdf = os.path.basename(urlparse(row.get("pdf_url") or "").path)
+        download, script = "<p>Not available</p>", ""
+        if pdf and self.needs_js(key):
+            download, script = "", JS_LINK.format(pdf=pdf)
+        elif pdf:
+            download = f'<a href="/pdffiles/{pdf}" target="_blank">Download PDF</a>'
+        return ACT_PAGE.format(title=row["act_title"], category=row["category_title"],
+                               download=download, script=script)
+
+    def pdf_bytes(self, name):
+        row = self.pdfs.get(name)
+        if row is None or not row.get("status", "").startswith("downloaded"):
+            return None
+        path = os.path.join(PDF_DIR, name)
+        if os.path.exists(path):
+            body = open(path, "rb").read()
+        else:
+            body = f"%PDF-1.4\n% mock copy of {name}\n%%EOF\n".encode()
+        if self.picked(name, "amended", self.amended):
+            body += b"\n% amended\n"
+        return body
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, body=b"", ctype="text/html; charset=utf-8", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            if site.latency:
+                time.sleep(site.latency)
+            path = unquote(urlparse(self.path).path)
+            m_cat = re.search(r"catid=(\d+)", path)
+            name = path.rsplit("/", 1)[-1]
+
+            if path == CATEGORIES_PATH:
+                site.count("categories")
+                return self.send(200, site.categories_html.encode())
+            if m_cat:
+                site.count("listing")
+                return self.send(200, site.listing(int(m_cat.group(1))).encode())
+            if path.startswith("/pdffiles/"):
+                site.count("pdf")
+                body = site.pdf_bytes(name)
+                if body is None:
+                    return self.send(404, b"Not Found", "text/plain")
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                last_mod = "Mon, 01 Jan 2024 00:00:00 GMT"
+                if self.headers.get("If-None-Match") == etag or (
+                        "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == last_mod):
+                    site.count("not_modified")
+                    return self.send(304, b"", "application/pdf", {"ETag": etag})
+                validators = {"ETag": etag, "Last-Modified": last_mod}
+                m_range = re.match(r"bytes=(\d+)-$", self.headers.get("Range", ""))
+                if m_range:
+                    start = int(m_range.group(1))
+                    if start >= len(body):
+                        return self.send(416, b"", "text/plain", {"Content-Range": f"bytes */{len(body)}"})
+                    site.count("range")
+                    return self.send(206, body[start:], "application/pdf",
+                                     {"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}", **validators})
+                return self.send(200, body, "application/pdf", {"Accept-Ranges": "bytes", **validators})
+            if name in site.acts:
+                site.count("act")
+                return self.send(200, site.act_page(name, site.acts[name]).encode())
+            return self.send(404, b"Not Found", "text/plain")
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def serve(port=8765, latency_ms=0, js_only=0.0, amended=0.0):
+    """Start the mock in a background thread; returns (server, site)."""
+    site = MockSite(latency_ms, js_only, amended)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, site
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve a local mock of pakistancode.gov.pk.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=int, default=0, help="Added delay per request (ms)")
+    ap.add_argument("--js-only", type=float, default=0.0, help="Fraction of Act pages whose PDF link needs JS")
+    ap.add_argument("--amended", type=float, default=0.0, help="Fraction of PDFs served with changed content")
+    args = ap.parse_args()
+    server, site = serve(args.port, args.latency, args.js_only, args.amended)
+    print(f"Mock site: http://127.0.0.1:{server.server_port}{CATEGORIES_PATH}")
+    print(f"{len(site.by_cat)} categories, {len(site.acts)} acts, {len(site.pdfs)} PDFs. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
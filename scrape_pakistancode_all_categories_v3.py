@@ -7,26 +7,53 @@ Scrape ALL categories on Pakistan Code (English) and download each Act's PDF.
 - Enters each Act, clicks "Print/Download PDF", grabs the real PDF URL
 - Downloads PDFs, logs to CSV, keeps a dedupe list across runs
 
-Requires: selenium, webdriver-manager, requests, beautifulsoup4
+Crawling is a work queue of (category, act) items served by --workers
+threads. Pages are fetched with plain HTTP + BeautifulSoup and the PDF
+link is read straight from the Act HTML; only Acts where that finds no
+PDF are opened in headless Chrome from a shared pool (--fetch auto,
+the default; --fetch http / browser force one path). Every
+request to a host first takes a token from that host's bucket (--rate
+requests/second, --burst), so throughput scales with workers while the
+site never sees more than the configured rate.
+
+Runs are resumable: log rows are appended to the CSV as each Act finishes,
+finished (category, act) pairs go to a checkpoint file and every category
+listing is cached, so a restart after a crash skips straight to the first
+unfinished Act without reloading listings. A run that completes without
+errors clears the checkpoint and cache; otherwise the next run retries
+only the errored Acts. --fresh discards them up front.
+
+Requires: requests, beautifulsoup4 (+ selenium, webdriver-manager for --fetch browser)
+Test locally against mock_pakistancode.py.
 """
 
 import os
 import re
 import time
 import csv
+import json
+import queue
+import hashlib
 import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from webdriver_manager.chrome import ChromeDriverManager
+except ImportError:  # --fetch http needs neither
+    webdriver = None
 
 
 # ========= DEFAULTS (edit if you like) =========
@@ -35,10 +62,14 @@ ENGLISH_ROOT = "https://www.pakistancode.gov.pk/english/"
 DEFAULT_OUT_DIR = "pakistan_code_pdfs"
 DEFAULT_LOG = "download_log.csv"
 DEFAULT_DEDUPE_FILE = "downloaded_urls.txt"
+DEFAULT_CHECKPOINT = "crawl_checkpoint.jsonl"
+DEFAULT_CACHE_DIR = "crawl_cache"
+LOG_FIELDS = ["category_id", "category_title", "act_title", "act_url", "pdf_url", "saved_path", "status"]
 
 TIMEOUT = 45
-POLITE_DELAY_ACT = 1.0
-POLITE_DELAY_CAT = 1.2
+RATE_PER_HOST = 1.0   # requests/second per host (token bucket refill)
+BURST_PER_HOST = 2    # tokens a host bucket can hold
+DEFAULT_WORKERS = 1
 HEADLESS_DEFAULT = True
 SKIP_ZERO_DEFAULT = True  # ignore categories showing (0)
 
@@ -55,7 +86,50 @@ def slugify(s: str) -> str:
     return re.sub(r"[^A-Za-z0-9\-_.() ]", "_", s)[:180]
 
 
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens/second, at most `burst` banked."""
+
+    def __init__(self, rate, burst=1):
+        self.rate, self.burst = float(rate), float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """One TokenBucket per host; wait(url) before every request to it."""
+
+    def __init__(self, rate=RATE_PER_HOST, burst=BURST_PER_HOST):
+        self.rate, self.burst = rate, burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        if self.rate <= 0:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
 def build_driver(headless: bool, download_dir=None):
+    if webdriver is None:
+        raise RuntimeError("--fetch browser needs selenium and webdriver-manager (pip install selenium webdriver-manager)")
     opts = Options()
     if headless:
         opts.add_argument("--headless=new")
@@ -78,15 +152,69 @@ def build_driver(headless: bool, download_dir=None):
     return driver
 
 
-def requests_session_from_driver(driver):
+class DriverPool:
+    """Up to `size` Chrome instances, created on first use and shared by workers."""
+
+    def __init__(self, size, headless, download_dir=None):
+        self.size, self.headless, self.download_dir = size, headless, download_dir
+        self.idle = queue.Queue()
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        try:
+            d = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                grow = len(self.drivers) < self.size
+                if grow:
+                    self.drivers.append(None)  # reserve the slot
+            if grow:
+                d = build_driver(self.headless, self.download_dir)
+                with self.lock:
+                    self.drivers[self.drivers.index(None)] = d
+            else:
+                d = self.idle.get()
+        try:
+            yield d
+        finally:
+            self.idle.put(d)
+
+    def close(self):
+        for d in self.drivers:
+            if d is not None:
+                try:
+                    d.quit()
+                except Exception:
+                    pass
+
+
+def new_session(pool_size=DEFAULT_WORKERS):
     s = requests.Session()
     s.headers.update({"User-Agent": UA})
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 10))
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def requests_session_from_driver(driver, pool_size=DEFAULT_WORKERS):
+    s = new_session(pool_size)
     # copy cookies from Selenium
     for c in driver.get_cookies():
         s.cookies.set(c.get("name"), c.get("value"))
     return s
 
 
+def http_get(session, limiter, url):
+    if limiter is not None:
+        limiter.wait(url)
+    r = session.get(url, timeout=TIMEOUT)
+    r.raise_for_status()
+    return r.text
+
+
 def open_categories_page(driver, url):
     driver.get(url)
     WebDriverWait(driver, TIMEOUT).until(
@@ -117,7 +245,7 @@ def open_categories_page(driver, url):
     return html
 
 
-def parse_categories(html: str, skip_zero: bool, only_ids_set):
+def parse_categories(html: str, skip_zero: bool, only_ids_set, base=ENGLISH_ROOT):
     soup = BeautifulSoup(html, "html.parser")
 
     # Prefer within the #category pane, fall back to any .deptlist
@@ -141,7 +269,7 @@ def parse_categories(html: str, skip_zero: bool, only_ids_set):
             if m:
                 count = int(m.group(1))
 
-        full = urljoin(ENGLISH_ROOT, href)
+        full = urljoin(base, href)
         m_id = re.search(r"catid=(\d+)", full)
         cat_id = int(m_id.group(1)) if m_id else None
 
@@ -168,7 +296,10 @@ def find_act_links_on_listing(driver, list_url):
         EC.presence_of_element_located((By.CSS_SELECTOR, "body"))
     )
     time.sleep(1.2)
-    html = driver.page_source
+    return parse_act_links(driver.page_source, list_url)
+
+
+def parse_act_links(html, list_url):
     soup = BeautifulSoup(html, "html.parser")
 
     anchors = soup.select(".accordion-section-title a[href], .accordion a[href]")
@@ -183,7 +314,7 @@ def find_act_links_on_listing(driver, list_url):
             continue
         if "coat.jpg" in href.lower() or "javascript:" in href.lower():
             continue
-        full = urljoin(ENGLISH_ROOT, href)
+        full = urljoin(list_url, href)
         acts.append((title, full))
 
     # de-dup
@@ -243,6 +374,36 @@ def try_extract_pdf_urls(driver):
     return [urljoin(base, u) for u in pdf_urls if u]
 
 
+PDF_HINTS = (".pdf", "download", "print", "export")
+# Act PDFs live at .../pdffiles/administrator<md5>.pdf
+PDF_FILE_RE = re.compile(r"""(?:https?://[^\s"'<>]+?)?/?pdffiles/[\w.%-]+?\.pdf""", re.I)
+
+
+def extract_pdf_urls_static(html, base_url):
+    """
+    PDF links from raw Act HTML (no JS, no tab click). A regex for the site's
+    pdffiles/ URLs runs first; the structural search mirroring
+    try_extract_pdf_urls is only needed when that finds nothing.
+    """
+    direct = set(PDF_FILE_RE.findall(html))
+    if direct:
+        return [urljoin(base_url, u) for u in direct]
+    soup = BeautifulSoup(html, "html.parser")
+    pdf_urls = set()
+    containers = [c for c in (soup.select_one("#download"), soup) if c is not None]
+    for el in containers:
+        for tag, attr in (("a", "href"), ("iframe", "src"), ("embed", "src")):
+            for node in el.select(f"{tag}[{attr}]"):
+                u = node.get(attr) or ""
+                if not u.startswith("#") and any(k in u.lower() for k in PDF_HINTS):
+                    pdf_urls.add(u)
+        for btn in el.select("button[onclick], a[onclick]"):
+            m = re.search(r"['\"](.*?\.pdf[^'\"}]*)['\"]", btn.get("onclick") or "", re.I)
+            if m:
+                pdf_urls.add(m.group(1))
+    return [urljoin(base_url, u) for u in pdf_urls if u]
+
+
 def download_pdf(session, url, out_dir, fname_hint=None):
     os.makedirs(out_dir, exist_ok=True)
     parsed = urlparse(url)
@@ -252,17 +413,21 @@ def download_pdf(session, url, out_dir, fname_hint=None):
     safe_name = slugify(base_name)
     out_path = os.path.join(out_dir, safe_name)
 
-    # avoid overwriting: if same name exists, append short hash
+    # avoid overwriting: if same name exists, append a short hash that is
+    # stable across runs (hash() is salted per process)
     if os.path.exists(out_path) and os.path.getsize(out_path) > 1024:
         root, ext = os.path.splitext(safe_name)
-        out_path = os.path.join(out_dir, f"{root}_{abs(hash(url)) % (10**8)}{ext}")
+        out_path = os.path.join(out_dir, f"{root}_{hashlib.sha256(url.encode()).hexdigest()[:8]}{ext}")
 
+    # write to a temp file and move it into place, so a crash never leaves a truncated PDF
+    tmp_path = out_path + ".part"
     with session.get(url, stream=True, timeout=90) as r:
         r.raise_for_status()
-        with open(out_path, "wb") as f:
-            for chunk in r.iter_content(8192):
+        with open(tmp_path, "wb") as f:
+            for chunk in r.iter_content(65536):
                 if chunk:
                     f.write(chunk)
+    os.replace(tmp_path, out_path)
     return out_path
 
 
@@ -279,38 +444,49 @@ def append_dedupe(path, url):
         f.write(url + "\n")
 
 
-def process_act(driver, session, act_title, act_url, cat_title, cat_id, save_dir):
-    status, pdf_url, saved = "skipped", "", ""
-    try:
-        driver.get(act_url)
+def open_act_download_tab(driver, act_url):
+    driver.get(act_url)
 
-        # Click the Print/Download tab if present
-        try:
-            tab = WebDriverWait(driver, 8).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        "//a[@id='pills-profile-tab' or contains(., 'Print/Download')]"
-                        "[contains(@href, '#download')]",
-                    )
+    # Click the Print/Download tab if present
+    try:
+        tab = WebDriverWait(driver, 8).until(
+            EC.element_to_be_clickable(
+                (
+                    By.XPATH,
+                    "//a[@id='pills-profile-tab' or contains(., 'Print/Download')]"
+                    "[contains(@href, '#download')]",
                 )
             )
-            tab.click()
-            WebDriverWait(driver, 8).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, "#download"))
-            )
-        except Exception:
-            pass
+        )
+        tab.click()
+        WebDriverWait(driver, 8).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, "#download"))
+        )
+    except Exception:
+        pass
+
 
-        candidates = try_extract_pdf_urls(driver)
+def process_act(find_pdfs, session, limiter, act_title, act_url, cat_title, cat_id, save_dir, download=True):
+    """
+    `find_pdfs(act_url)` returns candidate PDF URLs (browser or static).
+    With download=False the PDF URL is only logged (status "found") for
+    download_pdfs.py to fetch.
+    """
+    status, pdf_url, saved = "skipped", "", ""
+    try:
+        candidates = find_pdfs(act_url)
         if not candidates:
             status = "no_pdf_found"
         else:
             # prefer URLs that already end with .pdf
             candidates.sort(key=lambda u: (".pdf" not in u.lower(), len(u)))
             pdf_url = candidates[0]
-            saved = download_pdf(session, pdf_url, save_dir, fname_hint=act_title)
-            status = "downloaded"
+            if download:
+                limiter.wait(pdf_url)
+                saved = download_pdf(session, pdf_url, save_dir, fname_hint=act_title)
+                status = "downloaded"
+            else:
+                status = "found"
     except Exception as e:
         status = f"error: {e}"
     return {
@@ -324,11 +500,223 @@ def process_act(driver, session, act_title, act_url, cat_title, cat_id, save_dir
     }
 
 
+class Crawler:
+    """
+    Shared state for crawl workers: one pooled requests session, the per-host
+    rate limiter, the driver pool (browser / auto; Chrome starts only when
+    first needed) and PDF discovery stats.
+    """
+
+    def __init__(self, fetch, workers, limiter, headless=True, out_dir=None):
+        self.fetch, self.workers, self.limiter = fetch, max(1, workers), limiter
+        self.pool = None
+        if fetch == "browser" or (fetch == "auto" and webdriver is not None):
+            self.pool = DriverPool(self.workers, headless, out_dir)
+        elif fetch == "auto":
+            print("⚠️ selenium not installed: Acts without a static PDF link will not be retried in a browser.")
+        self.session = new_session(self.workers)
+        self.lock = threading.Lock()
+        self.stats = {"static": [], "browser": [], "failed": 0}
+
+    def record(self, path, t0):
+        with self.lock:
+            self.stats[path].append(time.perf_counter() - t0)
+
+    def discovery_report(self):
+        st, br, failed = self.stats["static"], self.stats["browser"], self.stats["failed"]
+        total = len(st) + len(br) + failed
+        if not total:
+            return "PDF discovery: no Acts processed."
+        avg = lambda xs: f"{sum(xs) / len(xs) * 1000:.0f} ms avg" if xs else "—"
+        return (f"PDF discovery: {len(st)}/{total} static ({len(st) / total:.1%}, {avg(st)}), "
+                f"{len(br)} browser fallback ({avg(br)}), {failed} not found")
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+
+    # ---------- pages ----------
+    def categories_page(self, url):
+        if self.fetch != "browser":
+            return http_get(self.session, self.limiter, url)
+        with self.pool.driver() as d:
+            self.limiter.wait(url)
+            html = open_categories_page(d, url)
+            # cookies from the first browser visit carry over to downloads
+            self.session = requests_session_from_driver(d, self.workers)
+        return html
+
+    def list_acts(self, cat):
+        if self.fetch != "browser":
+            acts = parse_act_links(http_get(self.session, self.limiter, cat["url"]), cat["url"])
+            if acts or self.pool is None:
+                return acts
+        with self.pool.driver() as d:
+            self.limiter.wait(cat["url"])
+            return find_act_links_on_listing(d, cat["url"])
+
+    def find_pdfs(self, act_url):
+        """Static parse first (auto / http), browser fallback (auto / browser) when it finds no PDF or fails."""
+        if self.fetch != "browser":
+            self.limiter.wait(act_url)
+            t0 = time.perf_counter()
+            try:
+                urls = extract_pdf_urls_static(http_get(self.session, None, act_url), act_url)
+            except requests.RequestException as e:
+                if self.pool is None:
+                    raise
+                print(f"  ↪️ {act_url}: static fetch failed ({e}); trying the browser")
+                urls = []
+            if any(".pdf" in u.lower() for u in urls):
+                self.record("static", t0)
+                return urls
+        if self.pool is None:
+            with self.lock:
+                self.stats["failed"] += 1
+            return []
+        with self.pool.driver() as d:
+            self.limiter.wait(act_url)
+            t0 = time.perf_counter()
+            open_act_download_tab(d, act_url)
+            urls = try_extract_pdf_urls(d)
+        if urls:
+            self.record("browser", t0)
+        else:
+            with self.lock:
+                self.stats["failed"] += 1
+        return urls
+
+    # ---------- work queue ----------
+    def run(self, items, handle):
+        """Feed (index, item) pairs from a queue to `workers` threads; handle(n, item) per item."""
+        work = queue.Queue()
+        for n, item in enumerate(items):
+            work.put((n, item))
+
+        def worker():
+            while True:
+                try:
+                    n, item = work.get_nowait()
+                except queue.Empty:
+                    return
+                handle(n, item)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(items)) or 1)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
 def get_cat_id_from_url(u: str):
     m = re.search(r"catid=(\d+)", u)
     return int(m.group(1)) if m else None
 
 
+def _cat_key(value):
+    """Category id as checkpointed (int or None) from its CSV cell."""
+    return int(value) if str(value).isdigit() else None
+
+
+class CrawlState:
+    """
+    Crash-safe progress for one crawl: the streaming CSV log, a JSONL
+    checkpoint of finished (category id, act url) pairs and cached
+    category listings. Errored Acts are logged but not checkpointed, so
+    the next run retries them (and replaces their error rows).
+    """
+
+    def __init__(self, log_path, checkpoint_path, cache_dir, fresh=False):
+        self.checkpoint_path, self.cache_dir = checkpoint_path, cache_dir
+        if fresh:
+            self.clear()
+        self.resuming = os.path.exists(checkpoint_path)
+        self.finished = set()
+        if self.resuming:
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                for ln in f:
+                    try:
+                        r = json.loads(ln)
+                    except ValueError:
+                        continue  # torn last line
+                    self.finished.add((r["category_id"], r["act_url"]))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # A new crawl starts a new log; a resumed one keeps appending to it
+        append = self.resuming and os.path.exists(log_path) and os.path.getsize(log_path) > 0
+        if append:
+            self.drop_retried_errors(log_path)
+        self.log_file = open(log_path, "a" if append else "w", newline="", encoding="utf-8")
+        self.log = csv.DictWriter(self.log_file, fieldnames=LOG_FIELDS)
+        if not append:
+            self.log.writeheader()
+            self.log_file.flush()
+        self.ckpt_file = open(checkpoint_path, "a", encoding="utf-8")
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def drop_retried_errors(self, log_path):
+        """Remove error rows of unfinished Acts: this run retries them and logs the outcome afresh."""
+        with open(log_path, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        keep = [r for r in rows if not (r["status"].startswith("error") and
+                                        (_cat_key(r["category_id"]), r["act_url"]) not in self.finished)]
+        if len(keep) == len(rows):
+            return
+        with open(log_path + ".tmp", "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=LOG_FIELDS)
+            w.writeheader()
+            w.writerows(keep)
+        os.replace(log_path + ".tmp", log_path)
+
+    def listing_path(self, cat):
+        # keyed by URL: categories without a catid all have id None
+        digest = hashlib.sha1(cat["url"].encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"listing_{digest}.json")
+
+    def cached_listing(self, cat):
+        try:
+            with open(self.listing_path(cat), "r", encoding="utf-8") as f:
+                return [tuple(a) for a in json.load(f)["acts"]]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_listing(self, cat, acts):
+        path = self.listing_path(cat)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"url": cat["url"], "title": cat["title"], "acts": acts}, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def done(self, cat, act_url):
+        return (cat["id"], act_url) in self.finished
+
+    def record(self, row):
+        with self.lock:
+            self.log.writerow(row)
+            self.log_file.flush()
+            if row["status"].startswith("error"):
+                self.errors += 1
+            else:
+                self.finished.add((row["category_id"], row["act_url"]))
+                self.ckpt_file.write(json.dumps({"category_id": row["category_id"], "act_url": row["act_url"]}) + "\n")
+                self.ckpt_file.flush()
+
+    def close(self, completed=False):
+        """A completed crawl with no errors clears its checkpoint and cache."""
+        self.log_file.close()
+        self.ckpt_file.close()
+        if completed and not self.errors:
+            self.clear()
+
+    def clear(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.startswith("listing_"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
 def main():
     # Optional CLI flags (all have safe defaults so you can run without args)
     ap = argparse.ArgumentParser(description="Scrape Pakistan Code categories & download PDFs.")
@@ -339,6 +727,17 @@ def main():
     ap.add_argument("--out", default=DEFAULT_OUT_DIR, help="Output folder for PDFs")
     ap.add_argument("--log", default=DEFAULT_LOG, help="CSV log path")
     ap.add_argument("--dedupe", default=DEFAULT_DEDUPE_FILE, help="Text file to track downloaded PDF URLs")
+    ap.add_argument("--fetch", choices=["auto", "http", "browser"], default="auto",
+                    help="auto: HTTP + static parse, Chrome only for Acts where that fails; "
+                         "http: never start Chrome; browser: always Chrome")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel workers (= Chrome instances)")
+    ap.add_argument("--rate", type=float, default=RATE_PER_HOST, help="Max requests/second per host (0 = unlimited)")
+    ap.add_argument("--burst", type=int, default=BURST_PER_HOST, help="Requests a host may receive back-to-back")
+    ap.add_argument("--skip-download", action="store_true",
+                    help="Only discover PDF URLs (status 'found'); fetch them with download_pdfs.py")
+    ap.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Finished-Act checkpoint (JSONL)")
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Cached category listings")
+    ap.add_argument("--fresh", action="store_true", help="Ignore any checkpoint / cached listings and start over")
     args = ap.parse_args()
 
     only_ids_set = set(int(x) for x in args.only.split(",") if x.strip().isdigit()) if args.only else None
@@ -346,68 +745,74 @@ def main():
 
     os.makedirs(args.out, exist_ok=True)
 
-    driver = build_driver(headless=(not args.headful), download_dir=args.out)
-
-    # Navigate first, THEN create the requests session so cookies carry over
-    html = open_categories_page(driver, args.categories_url)
-    session = requests_session_from_driver(driver)
-
-    downloaded_urls = ensure_dedupe_file(args.dedupe)
-    cats = parse_categories(html, skip_zero=skip_zero, only_ids_set=only_ids_set)
-
-    if not cats:
-        print("No categories found. Check debug_categories.html to see what Selenium received.")
-        driver.quit()
-        return
-
-    print(f"Found {len(cats)} categories.")
-    rows = []
-    for ci, cat in enumerate(cats, 1):
-        cat_title, cat_url, cat_id = cat["title"], cat["url"], cat["id"]
-        print(f"\n=== [{ci}/{len(cats)}] Category: {cat_title} (id={cat_id}, count={cat['count']}) ===")
-
-        acts = find_act_links_on_listing(driver, cat_url)
-        print(f"Found {len(acts)} acts in this category.")
-
-        for i, (act_title, act_url) in enumerate(acts, 1):
-            print(f"  [{i}/{len(acts)}] {act_title}")
-            res = process_act(driver, session, act_title, act_url, cat_title, cat_id, args.out)
-
-            # cross-run de-dupe by final pdf_url
-            if res["pdf_url"]:
-                if res["pdf_url"] in downloaded_urls and res["status"] == "downloaded":
-                    res["status"] = "duplicate_skipped"
-                elif res["status"] == "downloaded":
-                    downloaded_urls.add(res["pdf_url"])
-                    append_dedupe(args.dedupe, res["pdf_url"])
-
-            rows.append(res)
-            time.sleep(POLITE_DELAY_ACT)
-
-        time.sleep(POLITE_DELAY_CAT)
-
-    # Write CSV log
-    with open(args.log, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "category_id",
-                "category_title",
-                "act_title",
-                "act_url",
-                "pdf_url",
-                "saved_path",
-                "status",
-            ],
-        )
-        w.writeheader()
-        w.writerows(rows)
-
-    driver.quit()
-    print(f"\nDone. PDFs → {os.path.abspath(args.out)}")
+    crawler = Crawler(args.fetch, args.workers, HostLimiter(args.rate, args.burst),
+                      headless=(not args.headful), out_dir=args.out)
+    state = CrawlState(args.log, args.checkpoint, args.cache_dir, fresh=args.fresh)
+    if state.resuming:
+        print(f"↩️ Resuming: {len(state.finished)} acts already done ({args.checkpoint})")
+    t0 = time.perf_counter()
+    completed = False
+    items = []
+    try:
+        html = crawler.categories_page(args.categories_url)
+        downloaded_urls = ensure_dedupe_file(args.dedupe)
+        cats = parse_categories(html, skip_zero=skip_zero, only_ids_set=only_ids_set, base=args.categories_url)
+
+        if not cats:
+            print("No categories found. Check debug_categories.html to see what Selenium received.")
+            return
+
+        def load_listing(cat):
+            acts = state.cached_listing(cat)
+            if acts is None:
+                acts = crawler.list_acts(cat)
+                state.save_listing(cat, acts)
+            return acts
+
+        cached = sum(os.path.exists(state.listing_path(c)) for c in cats)
+        print(f"Found {len(cats)} categories ({cached} listings cached). "
+              f"Fetching {len(cats) - cached} listing(s) with {crawler.workers} worker(s)...")
+        with ThreadPoolExecutor(max_workers=crawler.workers) as ex:
+            listings = list(ex.map(load_listing, cats))
+
+        for ci, (cat, acts) in enumerate(zip(cats, listings), 1):
+            left = [(t, u) for t, u in acts if not state.done(cat, u)]
+            print(f"=== [{ci}/{len(cats)}] Category: {cat['title']} (id={cat['id']}, count={cat['count']}) "
+                  f"→ {len(acts)} acts, {len(left)} to do")
+            items.extend((cat, act_title, act_url) for act_title, act_url in left)
+
+        done = [0]
+
+        def handle(n, item):
+            cat, act_title, act_url = item
+            res = process_act(crawler.find_pdfs, crawler.session, crawler.limiter,
+                              act_title, act_url, cat["title"], cat["id"], args.out,
+                              download=not args.skip_download)
+            with crawler.lock:
+                # cross-run de-dupe by final pdf_url
+                if res["pdf_url"]:
+                    if res["pdf_url"] in downloaded_urls and res["status"] == "downloaded":
+                        res["status"] = "duplicate_skipped"
+                    elif res["status"] == "downloaded":
+                        downloaded_urls.add(res["pdf_url"])
+                        append_dedupe(args.dedupe, res["pdf_url"])
+                done[0] += 1
+                print(f"  [{done[0]}/{len(items)}] {act_title} → {res['status']}")
+            state.record(res)
+
+        crawler.run(items, handle)
+        completed = True
+    finally:
+        crawler.close()
+        state.close(completed=completed)
+
+    elapsed = time.perf_counter() - t0
+    print(f"\nDone. {len(items)} acts in {elapsed:.1f}s ({len(items) / max(elapsed, 1e-9) * 60:.0f} acts/min)")
+    print(crawler.discovery_report())
+    print(f"PDFs → {os.path.abspath(args.out)}")
     print(f"Log  → {os.path.abspath(args.log)}")
     print(f"Dedupe file → {os.path.abspath(args.dedupe)}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
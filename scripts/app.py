@@ -1,5 +1,6 @@
-from flask import Flask, request, jsonify
-from query_law_pro import ask
+from flask import Flask, Response, request, jsonify
+from query_law_pro import ask, search
+from tracing import REGISTRY
 
 app = Flask(__name__)
 
@@ -8,8 +9,31 @@ def ask_law():
     q = request.json.get("query", "")
     if not q:
         return jsonify({"error": "Query is required"}), 400
-    answer = ask(q)
-    return jsonify({"query": q, "answer": answer})
+    filters = request.json.get("filters")  # {"law": [...], "category": [...], "year_from": .., "year_to": ..}
+    explain = request.json.get("explain", True)  # False: cited sections come back verbatim, no LLM call
+    try:
+        answer = ask(q, filters=filters, explain=bool(explain))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"query": q, "filters": filters, "answer": answer})
+
+@app.route("/search", methods=["POST"])
+def search_law():
+    """Exact phrase / NEAR/n / AND / OR / NOT search over section bodies, e.g. '"lawful excuse" NEAR/5 arms'."""
+    q = request.json.get("query", "")
+    if not q:
+        return jsonify({"error": "Query is required"}), 400
+    try:
+        hits = search(q, k=int(request.json.get("k", 20)), filters=request.json.get("filters"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"query": q, "hits": [{"law": h["meta"]["law"], "section_no": h["meta"]["section_no"],
+                                         "section_title": h["meta"].get("section_title", ""),
+                                         "score": h["score"]} for h in hits]})
+
+@app.route("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     app.run(port=8000, debug=True)
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+batch_ask.py
+------------------------------------------------------------
+Purpose:
+    Answer a file of legal questions in one process (e.g. a compliance
+    checklist for a new bank branch) without re-loading the indexes per
+    question.
+
+Pipeline (per chunk of --chunk questions):
+    1. embeddings requested in bulk (--emb-batch inputs per API call)
+    2. one matrix FAISS search for the whole chunk
+    3. one multi-query BM25 pass (InvertedIndex.batch_scores)
+    4. rerank + context packing per question
+    5. chat completions with bounded concurrency (--concurrency)
+    Results stream to the output JSONL as they finish; re-running with
+    the same output file skips questions already answered.
+
+Input:
+    JSONL with {"id"?, "query"} per line, or CSV with a "query" column
+    (and optional "id"). Missing ids default to the line number.
+
+Usage:
+    python batch_ask.py checklist.csv --out answers.jsonl --concurrency 8
+------------------------------------------------------------
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import faiss
+
+import query_law_pro as qlp
+from lexical import tokenize
+
+
+def read_queries(path):
+    rows = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for n, r in enumerate(csv.DictReader(f), 1):
+                if (r.get("query") or "").strip():
+                    rows.append({"id": str(r.get("id") or n), "query": r["query"].strip()})
+        else:
+            for n, ln in enumerate(f, 1):
+                if ln.strip():
+                    r = json.loads(ln)
+                    rows.append({"id": str(r.get("id", n)), "query": r["query"].strip()})
+    return rows
+
+
+def done_ids(path):
+    """Ids already present in the output file (for resuming)."""
+    if not os.path.exists(path):
+        return set()
+    ids = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            try:
+                ids.add(str(json.loads(ln)["id"]))
+            except (ValueError, KeyError):
+                continue  # torn last line from an interrupted run
+    return ids
+
+
+def embed_bulk(texts, batch):
+    out = []
+    for i in range(0, len(texts), batch):
+        resp = qlp.client.embeddings.create(model=qlp.MODEL_EMB, input=[t[:8000] for t in texts[i:i + batch]])
+        out.extend(d.embedding for d in resp.data)
+    Q = np.array(out, dtype="float32")
+    faiss.normalize_L2(Q)
+    return Q
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Batch question answering over the Pakistan Code index.")
+    ap.add_argument("input", help="JSONL or CSV file of queries")
+    ap.add_argument("--out", default="batch_answers.jsonl")
+    ap.add_argument("--concurrency", type=int, default=4, help="Parallel chat completions")
+    ap.add_argument("--emb-batch", type=int, default=100, help="Inputs per embeddings API call")
+    ap.add_argument("--chunk", type=int, default=200, help="Questions retrieved together per pass")
+    ap.add_argument("--urdu", action="store_true")
+    ap.add_argument("--reranker", default=qlp.RERANKER)
+    ap.add_argument("--retrieve-only", action="store_true", help="Skip the LLM; write retrieved sections only")
+    args = ap.parse_args()
+
+    rows = read_queries(args.input)
+    skip = done_ids(args.out)
+    todo = [r for r in rows if r["id"] not in skip]
+    print(f"📋 {len(rows)} queries • {len(rows) - len(todo)} already answered • {len(todo)} to run")
+    if not todo:
+        return
+
+    lock = threading.Lock()
+    out = open(args.out, "a", encoding="utf-8")
+
+    def emit(rec):
+        with lock:
+            out.write(json.dumps(rec, ensure_ascii=False, default=qlp.safe_json) + "\n")
+            out.flush()
+
+    def run_one(r, hits):
+        if args.retrieve_only:
+            answer, conf = None, float(np.mean([h["score"] for h in hits[:qlp.TOP_N]])) if hits else 0.0
+        else:
+            answer, conf, hits, _, _ = qlp.answer(r["query"], hits, urdu=args.urdu)
+        emit({"id": r["id"], "query": r["query"], "confidence": round(conf, 3), "answer": answer,
+              "sections": [{"law": h["meta"]["law"], "section_no": h["meta"]["section_no"],
+                            "link": qlp.link(h["meta"]), "score": round(h["score"], 4)} for h in hits]})
+
+    t0 = time.perf_counter()
+    finished = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        for c in range(0, len(todo), args.chunk):
+            chunk = todo[c:c + args.chunk]
+            texts = [r["query"] for r in chunk]
+
+            t = time.perf_counter()
+            Q = embed_bulk(texts, args.emb_batch)
+            gen = qlp.live()  # one index generation for the whole chunk
+            D, I = gen.idx.search(Q, qlp.FAISS_POOL)
+            L = gen.bm25.batch_scores([tokenize(q) for q in texts])
+            print(f"🔎 Retrieved chunk of {len(chunk)} in {time.perf_counter() - t:.2f}s")
+
+            futures = []
+            for k, r in enumerate(chunk):
+                hits = qlp.retrieve(r["query"], qv=Q[k:k + 1], reranker=args.reranker,
+                                    top_n=qlp.PACK_POOL, pre=(D[k], I[k], L[k]), gen=gen)
+                futures.append(pool.submit(run_one, r, hits))
+            for f in as_completed(futures):
+                try:
+                    f.result()
+                    finished += 1
+                except Exception as e:
+                    print(f"⚠️ Query failed (will be retried on the next run): {e}")
+            elapsed = time.perf_counter() - t0
+            print(f"   {finished}/{len(todo)} done • {finished / elapsed * 60:.1f} queries/min")
+
+    out.close()
+    elapsed = time.perf_counter() - t0
+    print(f"\n✅ {finished} answers → {args.out}")
+    print(f"⏱️ {elapsed:.1f}s total • {finished / elapsed * 60:.1f} queries/min")
+
+
+if __name__ == "__main__":
+    main()
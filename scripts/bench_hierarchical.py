@@ -0,0 +1,124 @@
+"""
+bench_hierarchical.py
+------------------------------------------------------------
+Purpose:
+    Flat vs coarse-to-fine dense search as the corpus grows.
+
+    Scale s = the live index plus s-1 synthetic copies of every Act (its
+    section vectors + gaussian noise of norm --noise, renormalised),
+    standing in for the provincial codes that share the federal laws'
+    structure. Queries are noisy copies of random real sections. For each
+    scale and Act pool:
+
+        flat  exact top-k over all sections (FAISS IndexFlatIP)
+        hier  top-N Acts by centroid → top-k over their sections
+              (query_law_pro.hierarchical_search)
+
+    reports p50/p95 latency, hier's recall@k against flat's exact top-k,
+    and how often the query's source section is in the top-k ("hit").
+
+Output:
+    ../benchmarks/results/hier_<commit>.json
+
+Usage:
+    python bench_hierarchical.py
+    python bench_hierarchical.py --scales 1,2,4,8 --acts 10,20,50 --queries 300
+------------------------------------------------------------
+"""
+
+import os
+import json
+import time
+import argparse
+import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import faiss
+
+os.environ.setdefault("OPENAI_API_KEY", "offline")  # client is never called
+
+import query_law_pro as qlp  # noqa: E402
+from bench_retrieval import git_commit, pct, RESULTS_DIR  # noqa: E402
+
+
+def scaled(gen, scale, noise, rng):
+    """Act-level view of the live generation grown to `scale` copies of every Act."""
+    xb = [gen.xb]
+    acts = list(gen.act_rows)
+    n = gen.idx.ntotal
+    for c in range(1, scale):
+        v = gen.xb + rng.normal(0, noise / np.sqrt(gen.idx.d), gen.xb.shape).astype("float32")
+        faiss.normalize_L2(v)
+        xb.append(v)
+        acts.extend(r + c * n for r in gen.act_rows)
+    xb = np.ascontiguousarray(np.vstack(xb))
+    act_vecs = np.array([xb[r].mean(axis=0) for r in acts], dtype="float32")
+    faiss.normalize_L2(act_vecs)
+    idx = faiss.IndexFlatIP(xb.shape[1])
+    idx.add(xb)
+    return SimpleNamespace(idx=idx, xb=xb, act_rows=acts, act_vecs=act_vecs,
+                           act_files=[f"act{i}" for i in range(len(acts))])
+
+
+def timed(fn, queries):
+    ms, out = [], []
+    for q in queries:
+        t = time.perf_counter()
+        out.append(fn(q))
+        ms.append((time.perf_counter() - t) * 1000)
+    return out, {"p50": pct(ms, 50), "p95": pct(ms, 95)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark flat vs hierarchical (Act → section) dense search.")
+    ap.add_argument("--scales", default="1,2,4", help="Corpus sizes as multiples of the live index")
+    ap.add_argument("--acts", default="10,20,50", help="Act pool sizes for hierarchical search")
+    ap.add_argument("--k", type=int, default=qlp.FAISS_POOL, help="Sections per search (dense candidate pool)")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--noise", type=float, default=0.3, help="Noise norm (relative to the unit vectors) of synthetic Acts / queries")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    live = qlp.live()
+    src = rng.choice(live.idx.ntotal, size=min(args.queries, live.idx.ntotal), replace=False)
+    queries = live.xb[src] + rng.normal(0, args.noise / np.sqrt(live.idx.d), (len(src), live.idx.d)).astype("float32")
+    faiss.normalize_L2(queries)
+    queries = [queries[i:i + 1] for i in range(len(queries))]
+    k = args.k
+
+    print(f"🏁 {len(queries)} queries • k={k} • generation {live.name}: "
+          f"{live.idx.ntotal} sections in {len(live.act_files)} Acts")
+    rows = []
+    for scale in (int(s) for s in args.scales.split(",")):
+        gen = scaled(live, scale, args.noise, rng)
+        exact, flat_ms = timed(lambda q: gen.idx.search(q, k)[1][0], queries)
+        hit = float(np.mean([s in e for s, e in zip(src, exact)]))
+        rows.append({"scale": scale, "sections": gen.idx.ntotal, "acts": len(gen.act_files),
+                     "mode": "flat", "latency_ms": flat_ms, "recall": 1.0, "hit": round(hit, 4)})
+        print(f"  ×{scale:<3} {gen.idx.ntotal:>7} sections  flat        "
+              f"p50={flat_ms['p50']:7.2f} ms  p95={flat_ms['p95']:7.2f} ms  hit={hit:.3f}")
+        for acts in (int(a) for a in args.acts.split(",")):
+            found, ms = timed(lambda q: qlp.hierarchical_search(q, k, acts, gen)[1], queries)
+            recall = float(np.mean([len(set(f.tolist()) & set(e.tolist())) / max(1, len(e))
+                                    for f, e in zip(found, exact)]))
+            hit = float(np.mean([s in f for s, f in zip(src, found)]))
+            rows.append({"scale": scale, "sections": gen.idx.ntotal, "acts": len(gen.act_files),
+                         "mode": f"hier@{acts}", "latency_ms": ms, "recall": round(recall, 4), "hit": round(hit, 4)})
+            print(f"  ×{scale:<3} {gen.idx.ntotal:>7} sections  hier@{acts:<6}"
+                  f"p50={ms['p50']:7.2f} ms  p95={ms['p95']:7.2f} ms  hit={hit:.3f}  recall@{k}={recall:.3f}")
+        del gen
+
+    commit = git_commit()
+    out = args.out or os.path.join(RESULTS_DIR, f"hier_{commit}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                   "config": {"k": k, "queries": len(queries), "noise": args.noise, "generation": live.name},
+                   "results": rows}, f, indent=2)
+    print(f"\n💾 Results → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+bench_retrieval.py
+------------------------------------------------------------
+Purpose:
+    Offline retrieval benchmark. Runs the golden question set through
+    query_law_pro.retrieve() only (no chat completion) and reports
+    recall@k, MRR and p50/p95 latency per stage
+    (embed, faiss, bm25, phrase, fusion, rerank).
+
+Golden set (JSONL, one question per line):
+    {"query": "...", "expected": [{"law": "<law or file slug>", "section_no": "5"}]}
+
+Reranker sweep:
+    --reranker takes comma-separated specs  name[:faiss_pool:bm25_pool],
+    e.g.  blend:20:0,blend:100:100,cross-encoder:100:100  — every spec runs
+    on the same query vectors and is printed side by side; the first one
+    is the run recorded for --compare.
+
+Embeddings (no network needed once the cache exists):
+    --embeddings cache   query vectors from an .npz cache; misses are
+                         fetched from the API unless --offline is set
+    --embeddings stub    deterministic random unit vectors (latency only;
+                         dense recall is meaningless in this mode)
+
+Output:
+    ../benchmarks/results/<commit>.json — compare runs with --compare.
+
+Usage:
+    python bench_retrieval.py --embeddings cache --offline
+    python bench_retrieval.py --compare ../benchmarks/results/abc1234.json
+    python bench_retrieval.py --reranker blend:20:0,blend:100:100,cross-encoder:100:100
+------------------------------------------------------------
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import subprocess
+import numpy as np
+
+GOLDEN_PATH = "../benchmarks/golden_queries.jsonl"
+CACHE_PATH = "../benchmarks/golden_embeddings.npz"
+RESULTS_DIR = "../benchmarks/results"
+STAGES = ["embed", "faiss", "bm25", "phrase", "fusion", "rerank"]
+
+# A real key, if set, wins; the placeholder only lets query_law_pro import
+# for --offline / --embeddings stub runs, which never call the API.
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+import query_law_pro as qlp  # noqa: E402
+
+
+def load_queries(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(ln) for ln in f if ln.strip()]
+
+
+def is_expected(m, expected):
+    for e in expected:
+        law = str(e["law"]).lower()
+        if str(m["section_no"]) == str(e["section_no"]) and law in (m["law"].lower(), m.get("file", "").lower()):
+            return True
+    return False
+
+
+def parse_spec(spec):
+    """'blend' / 'blend:20:0' → (reranker, faiss_pool, bm25_pool)."""
+    name, *pools = spec.split(":")
+    if len(pools) not in (0, 2):
+        raise ValueError(f"Bad reranker spec {spec!r} (want name or name:faiss_pool:bm25_pool)")
+    fp, bp = (int(p) for p in pools) if pools else (qlp.FAISS_POOL, qlp.BM25_POOL)
+    return name, fp, bp
+
+
+def qkey(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbedder:
+    """Query vectors keyed by sha1(query); new ones are fetched once and saved."""
+
+    def __init__(self, path, offline):
+        self.path, self.offline, self.dirty = path, offline, False
+        self.vecs = dict(np.load(path)) if os.path.exists(path) else {}
+
+    def __call__(self, text):
+        k = qkey(text)
+        if k not in self.vecs:
+            if self.offline:
+                raise KeyError(f"No cached embedding for: {text!r} (run once without --offline)")
+            self.vecs[k] = qlp.emb(text)[0]
+            self.dirty = True
+        return self.vecs[k].reshape(1, -1)
+
+    def save(self):
+        if self.dirty:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            np.savez(self.path, **self.vecs)
+
+
+def stub_embedder(text):
+    rng = np.random.default_rng(int(qkey(text)[:8], 16))
+    v = rng.standard_normal((1, qlp.live().idx.d)).astype("float32")
+    return v / np.linalg.norm(v)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def pct(values, q):
+    return round(float(np.percentile(values, q)), 3) if values else 0.0
+
+
+def run(queries, embed, ks, reranker, repeat, faiss_pool=qlp.FAISS_POOL, bm25_pool=qlp.BM25_POOL):
+    top_n = max(ks)
+    stage_ms = {s: [] for s in STAGES + ["total"]}
+    per_query = []
+    for q in queries:
+        for _ in range(repeat):
+            timings = {}
+            t0 = time.perf_counter()
+            qv = embed(q["query"])
+            qlp.lap(timings, "embed", t0)
+            hits = qlp.retrieve(q["query"], qv=qv, reranker=reranker, top_n=top_n, timings=timings,
+                                faiss_pool=faiss_pool, bm25_pool=bm25_pool)
+            stage_ms["total"].append((time.perf_counter() - t0) * 1000)
+            for s in STAGES:
+                stage_ms[s].append(timings.get(s, 0.0))
+
+        rank = next((r for r, h in enumerate(hits, 1) if is_expected(h["meta"], q["expected"])), None)
+        per_query.append({"query": q["query"], "rank": rank,
+                          "top": [f"{h['meta'].get('file', h['meta']['law'])} §{h['meta']['section_no']}"
+                                  for h in hits[:3]]})
+
+    metrics = {f"recall@{k}": round(float(np.mean([1.0 if p["rank"] and p["rank"] <= k else 0.0
+                                                   for p in per_query])), 4) for k in ks}
+    metrics["mrr"] = round(float(np.mean([1.0 / p["rank"] if p["rank"] else 0.0 for p in per_query])), 4)
+    latency = {s: {"p50": pct(v, 50), "p95": pct(v, 95)} for s, v in stage_ms.items()}
+    return metrics, latency, per_query
+
+
+def compare(cur, path):
+    with open(path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    print(f"\n📈 vs {old.get('commit')} ({os.path.basename(path)})")
+    for k, v in cur["metrics"].items():
+        print(f"  {k:<12}{old['metrics'].get(k, 0):>8.3f} → {v:.3f}")
+    for s, v in cur["latency_ms"].items():
+        o = old["latency_ms"].get(s, {}).get("p50", 0.0)
+        print(f"  {s + ' p50':<12}{o:>8.2f} → {v['p50']:.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline retrieval benchmark on the golden query set.")
+    ap.add_argument("--golden", default=GOLDEN_PATH)
+    ap.add_argument("--embeddings", choices=["cache", "stub"], default="cache")
+    ap.add_argument("--cache", default=CACHE_PATH)
+    ap.add_argument("--offline", action="store_true", help="Never call the embedding API")
+    ap.add_argument("--k", default="1,5,10", help="Comma-separated cut-offs for recall@k")
+    ap.add_argument("--reranker", default=qlp.RERANKER,
+                    help="Comma-separated reranker specs name[:faiss_pool:bm25_pool] to sweep")
+    ap.add_argument("--dense", choices=["flat", "hier"], default=qlp.DENSE_MODE,
+                    help="Dense search: all sections, or top Acts first (see bench_hierarchical.py)")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per query")
+    ap.add_argument("--out", default="", help="Result JSON (default: results/<commit>.json)")
+    ap.add_argument("--compare", default="", help="Earlier result JSON to diff against")
+    args = ap.parse_args()
+    if args.repeat < 1:
+        ap.error("--repeat must be at least 1")
+
+    queries = load_queries(args.golden)
+    ks = sorted(int(k) for k in args.k.split(","))
+    qlp.DENSE_MODE = args.dense
+    embed = CachedEmbedder(args.cache, args.offline) if args.embeddings == "cache" else stub_embedder
+
+    try:
+        specs = [(spec, *parse_spec(spec)) for spec in args.reranker.split(",")]
+    except ValueError as e:
+        ap.error(str(e))
+
+    print(f"🏁 {len(queries)} golden queries • reranker={args.reranker} • dense={args.dense} • embeddings={args.embeddings}")
+    runs = {}
+    for spec, name, fp, bp in specs:
+        try:
+            runs[spec] = (name, fp, bp, *run(queries, embed, ks, name, args.repeat, fp, bp))
+        except ImportError as e:  # e.g. cross-encoder without sentence-transformers
+            print(f"  {spec:<28}skipped ({e})")
+    if args.embeddings == "cache":
+        embed.save()
+    if not runs:
+        return
+
+    commit = git_commit()
+    spec, (name, fp, bp, metrics, latency, per_query) = next(iter(runs.items()))
+    result = {
+        "commit": commit,
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": {"reranker": name, "dense": args.dense, "embeddings": args.embeddings,
+                   "faiss_pool": fp, "bm25_pool": bp, "n_vectors": int(qlp.live().idx.ntotal)},
+        "metrics": metrics,
+        "latency_ms": latency,
+        "per_query": per_query,
+    }
+
+    for k, v in metrics.items():
+        print(f"  {k:<12}{v:.3f}")
+    for s, v in latency.items():
+        print(f"  {s:<12}p50={v['p50']:8.3f} ms  p95={v['p95']:8.3f} ms")
+
+    if len(runs) > 1:
+        result["sweep"] = {sp: {"metrics": r[3], "latency_ms": r[4]} for sp, r in runs.items()}
+        cols = list(metrics)
+        print(f"\n{'reranker spec':<28}" + "".join(f"{c:>12}" for c in cols) + f"{'p50 ms':>10}{'p95 ms':>10}")
+        for sp, r in runs.items():
+            print(f"{sp:<28}" + "".join(f"{r[3][c]:>12.3f}" for c in cols)
+                  + f"{r[4]['total']['p50']:>10.1f}{r[4]['total']['p95']:>10.1f}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results → {out}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
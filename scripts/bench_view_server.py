@@ -0,0 +1,87 @@
+"""
+bench_view_server.py
+------------------------------------------------------------
+Purpose:
+    Small load test for view_server.py against the largest Act in
+    pakistan_code_structured (by section count). Drives the Flask app
+    in-process from a pool of client threads, so no server is needed.
+
+Usage:
+    python bench_view_server.py [--requests 500] [--threads 8]
+------------------------------------------------------------
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+LAW_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../pakistan_code_structured"))
+os.environ.setdefault("PAKLAW_LAW_DIR", LAW_DIR)
+
+import view_server  # noqa: E402  (reads PAKLAW_LAW_DIR at import)
+
+
+def largest_act():
+    best, best_n = None, -1
+    for fname in os.listdir(LAW_DIR):
+        if not fname.endswith(".json"):
+            continue
+        with open(os.path.join(LAW_DIR, fname), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        n = sum(len(ch.get("sections", [])) for ch in data.get("chapters", []))
+        if n > best_n:
+            best, best_n = fname[:-5], n
+    return best, best_n
+
+
+def run(label, url, headers, n, threads):
+    client = view_server.app.test_client
+
+    def one(_):
+        t0 = time.perf_counter()
+        r = client().get(url, headers=headers)
+        size = len(r.get_data())
+        return (time.perf_counter() - t0) * 1000, r.status_code, size
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        res = list(pool.map(one, range(n)))
+    wall = time.perf_counter() - t0
+
+    lat = sorted(r[0] for r in res)
+    p = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]
+    print(f"{label:<28} status={res[0][1]}  bytes={res[0][2]:>7}  "
+          f"p50={p(0.50):6.2f}ms  p95={p(0.95):6.2f}ms  rps={n / wall:7.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test the JSON viewer on the largest Act.")
+    ap.add_argument("--requests", type=int, default=500)
+    ap.add_argument("--threads", type=int, default=8)
+    args = ap.parse_args()
+
+    law, n_sections = largest_act()
+    print(f"📊 Largest Act: {law} ({n_sections} sections)\n")
+
+    first = view_server.app.test_client().get(f"/view?law={law}", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers.get("ETag")
+    sec = next(iter(view_server.LAWS.find(law)[1]["sections"]))
+
+    cases = [
+        ("TOC page 1 (identity)", f"/view?law={law}", {}),
+        ("TOC page 1 (gzip)", f"/view?law={law}", {"Accept-Encoding": "gzip"}),
+        ("TOC all, streamed (gzip)", f"/view?law={law}&page=all", {"Accept-Encoding": "gzip"}),
+        ("TOC revalidate (304)", f"/view?law={law}", {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ("Section page (gzip)", f"/view?law={law}&section={sec}", {"Accept-Encoding": "gzip"}),
+    ]
+    if view_server.brotli:
+        cases.insert(2, ("TOC page 1 (br)", f"/view?law={law}", {"Accept-Encoding": "br"}))
+
+    for label, url, headers in cases:
+        run(label, url, headers, args.requests, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,90 +5,326 @@ Professional Hybrid Index Builder for Pakistan Law Assistant.
 - Generates batched OpenAI embeddings (text-embedding-3-large)
 - Normalizes vectors for cosine similarity (FAISS IndexFlatIP)
 - Builds BM25 lexical index for hybrid retrieval
-- Saves FAISS index, metadata, and corpus
+- Clusters near-duplicate sections (MinHash/LSH, dedup.py) and embeds one
+  representative per cluster; members share its vector and a `dup_group`
+- Resolves each section's viewer link (file slug + section anchor) once
+- Joins scraper provenance (category, act URL, PDF SHA-256) onto every section
+- Orders sections by category so each category is one contiguous ID range
+- Builds law / year / category facets for filtered retrieval
+- Tags each section with a domain bitmask (taxonomy in domains.json)
+- Builds a gap-encoded positional index for phrase / NEAR / boolean search
+- Publishes FAISS index, metadata, corpus, facets, domain masks and
+  positions as one versioned generation (index_generations/, see generations.py)
+
+Usage:
+    python build_index_pro.py            # full rebuild
+    python build_index_pro.py --relink   # only refresh link fields in existing metadata
+    python build_index_pro.py --facets   # only rebuild facets for existing metadata
+    python build_index_pro.py --provenance   # only stamp provenance on existing metadata (keeps row order)
+    python build_index_pro.py --domains  # only re-tag domains (after editing domains.json)
+    python build_index_pro.py --positions    # only rebuild the positional index
+    python build_index_pro.py --update Slug_A Slug_B   # re-embed only these Acts
 """
 
-import os, json, faiss, numpy as np
+import os, json, argparse, faiss, numpy as np
+from urllib.parse import quote
 from openai import OpenAI
-from rank_bm25 import BM25Okapi
 from tqdm import tqdm
+from facets import build_facets, law_files
+from dedup import clusters, stats as dedup_stats
+from domains import Taxonomy, save_masks
+from positional import PositionalIndex
+from generations import GenerationWriter, paths, GEN_ROOT
+from provenance import load_provenance, stamp, pdf_stem, category_order, id_ranges
 
 # ------------------ CONFIG ------------------
 MODEL_EMB = "text-embedding-3-large"
 DATA_DIR = "../pakistan_code_structured"
-INDEX_PATH = "../pakistan_law_faiss.index"
-META_PATH = "../pakistan_law_metadata.json"
-BM25_PATH = "../pakistan_law_bm25.json"
+PDF_DIR = "../pakistan_code_pdfs"
+DOWNLOAD_LOG = "../download_log.csv"
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# ------------------ LINKS ------------------
+def resolve_link(row, file_slug):
+    """
+    Store the viewer target on the row itself: `file` is the structured JSON
+    name without extension (what view_server looks up), `anchor` the
+    URL-encoded section number. Citation rendering then needs no regex or stat.
+    """
+    row["file"] = file_slug
+    row["anchor"] = quote(str(row["section_no"]), safe="")
+    return row
+
+def load_meta(gen):
+    """Metadata of the generation `gen` (a GenerationWriter, holding the lock) builds on."""
+    return json.load(open(paths(gen.parent)["meta"], encoding="utf-8"))
+
+def save_meta(meta, path):
+    json.dump(meta, open(path, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
+
+def relink(data_dir=DATA_DIR):
+    """Add link fields to an existing metadata file without re-embedding."""
+    table = {}
+    for fname in sorted(os.listdir(data_dir)):
+        if not fname.endswith(".json"):
+            continue
+        try:
+            data = json.load(open(os.path.join(data_dir, fname), encoding="utf-8"))
+        except Exception:
+            continue
+        table.setdefault(f"{data.get('law_name', 'Unknown Law')} ({data.get('year', '')})", fname[:-5])
+
+    with GenerationWriter() as gen:
+        meta = load_meta(gen)
+        missing = 0
+        for row in meta:
+            slug = table.get(row["law"])
+            if slug:
+                resolve_link(row, slug)
+            else:
+                row.pop("file", None)
+                row.pop("anchor", None)
+                missing += 1
+        save_meta(meta, gen.path("meta"))
+        gen.carry("index", "bm25", "facets", "domains", "positions", rebuild=derived(meta))
+        print(f"🔗 Linked {len(meta) - missing}/{len(meta)} rows")
+        gen.publish(len(meta))
+
+# ------------------ FACETS ------------------
+def save_facets(meta, facets_path):
+    facets = build_facets(meta, DATA_DIR, DOWNLOAD_LOG)
+    json.dump(facets, open(facets_path, "w", encoding="utf-8"), ensure_ascii=False)
+    print(f"🏷️ Facets: {len(facets['law'])} laws, {len(facets['category'])} categories "
+          f"({len(facets['category_range'])} contiguous) → {facets_path}")
+
+# ------------------ DOMAINS ------------------
+def save_domains(meta, masks_path):
+    taxonomy = Taxonomy.load()
+    masks = save_masks(meta, taxonomy, masks_path)
+    counts = {n: int(((masks >> i) & 1).sum()) for i, n in enumerate(taxonomy.names)}
+    print(f"🏛️ Domains: {counts} → {masks_path}")
+
+# ------------------ POSITIONS ------------------
+def save_positions(meta, positions_path):
+    index = PositionalIndex.build([s["text"] for s in meta])
+    index.save(positions_path)
+    st = index.stats()
+    print(f"📍 Positions: {st['terms']} terms, {st['postings']} postings in {st['bytes'] / 1e6:.1f} MB → {positions_path}")
+
+def derived(meta):
+    """Rebuilders for derived files a parent generation may lack (see GenerationWriter.carry)."""
+    return {"positions": lambda path: save_positions(meta, path)}
+
+# ------------------ PROVENANCE ------------------
+def restamp():
+    """
+    Add provenance fields to an existing metadata file without re-embedding.
+    Row order is kept (it must match the FAISS index); category ranges only
+    become contiguous after a full build.
+    """
+    prov = load_provenance(DOWNLOAD_LOG, PDF_DIR)
+    stems = {slug: stem for slug, (_, stem) in law_files(DATA_DIR).items()}
+    with GenerationWriter() as gen:
+        meta = load_meta(gen)
+        missing = 0
+        for row in meta:
+            p = prov.get(stems.get(row.get("file"), ""))
+            missing += p is None
+            stamp(row, p)
+        save_meta(meta, gen.path("meta"))
+        print(f"🧾 Provenance on {len(meta) - missing}/{len(meta)} rows")
+        save_facets(meta, gen.path("facets"))
+        gen.carry("index", "bm25", "domains", "positions", rebuild=derived(meta))
+        gen.publish(len(meta))
+
+def rederive(key):
+    """New generation with only facets, domain masks or positions recomputed from the current metadata."""
+    with GenerationWriter() as gen:
+        meta = load_meta(gen)
+        {"facets": save_facets, "domains": save_domains, "positions": save_positions}[key](meta, gen.path(key))
+        gen.carry(*(k for k in ("index", "meta", "bm25", "facets", "domains", "positions") if k != key), rebuild=derived(meta))
+        gen.publish(len(meta))
+
 # ------------------ EXTRACT ------------------
-def extract_sections(json_path):
+def extract_sections(json_path, prov=None):
     """Load each law JSON and extract its sections with metadata."""
     try:
         data = json.load(open(json_path, encoding="utf-8"))
         law = data.get("law_name", "Unknown Law")
         year = data.get("year", "")
+        file_slug = os.path.splitext(os.path.basename(json_path))[0]
+        source = (prov or {}).get(pdf_stem(data.get("source_file")))
         for ch in data.get("chapters", []):
             for sec in ch.get("sections", []):
                 text = sec.get("body", "").strip()
                 if len(text) < 20:
                     continue
-                yield {
+                yield stamp(resolve_link({
                     "law": f"{law} ({year})",
                     "section_no": sec.get("section_no", "?"),
                     "section_title": sec.get("section_title", ""),
                     "text": text
-                }
+                }, file_slug), source)
     except Exception as e:
         print(f"⚠️ Skipped {json_path}: {e}")
         return []
 
+# ------------------ EMBED / SAVE ------------------
+def embed_texts(texts, batch=50):
+    """L2-normalised embeddings (cosine similarity via inner product)."""
+    embeddings = []
+    for i in tqdm(range(0, len(texts), batch)):
+        emb = client.embeddings.create(model=MODEL_EMB, input=texts[i:i + batch])
+        for e in emb.data:
+            embeddings.append(e.embedding)
+    embeddings = np.array(embeddings, dtype="float32")
+    if len(embeddings):
+        faiss.normalize_L2(embeddings)
+    return embeddings
+
+def embed_deduped(sections, known=None, batch=50):
+    """
+    Vectors for `sections` (final row order), embedding one representative
+    per near-duplicate cluster and sharing its vector with the members.
+    `known` (row → existing vector, from update()) is kept as is and also
+    stands in for new rows in its cluster. Rows in clusters get `dup_group`
+    = their representative's row. Returns (vectors, dedup stats).
+    """
+    known = known or {}
+    rep = clusters([s["text"] for s in sections])
+    sizes = np.bincount(rep, minlength=len(rep))
+    for i, row in enumerate(sections):
+        row.pop("dup_group", None)
+        if sizes[rep[i]] > 1:
+            row["dup_group"] = int(rep[i])
+
+    source = {}
+    for i, v in known.items():
+        source.setdefault(int(rep[i]), v)
+    needed = len(sections) - len(known)
+    todo = sorted({int(rep[i]) for i in range(len(sections)) if i not in known} - source.keys())
+    if todo:
+        source.update(zip(todo, embed_texts([sections[r]["text"] for r in todo], batch)))
+    vectors = np.stack([known[i] if i in known else source[int(rep[i])] for i in range(len(sections))])
+
+    st = dedup_stats(rep)
+    st.update(needed_vectors=needed, embedded_texts=len(todo),
+              embedding_calls_saved=-(-needed // batch) - -(-len(todo) // batch))
+    print(f"🧬 Dedup: {st['duplicates']} of {st['sections']} sections in {st['clusters']} near-duplicate clusters "
+          f"(ratio {st['dedup_ratio']:.1%}); embedded {len(todo)} of {needed} new texts, "
+          f"{st['embedding_calls_saved']} embedding calls saved")
+    return np.ascontiguousarray(vectors, dtype="float32"), st
+
+def save_index(gen, sections, embeddings, stats=None):
+    """
+    Publish FAISS index, metadata, BM25 corpus, facets, domain masks and positions for
+    `sections` (row-aligned) as generation `gen`; returns its name.
+    `stats` (e.g. dedup) is recorded in the generation manifest.
+    """
+    print("🧠 Creating FAISS cosine-similarity index...")
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+
+    print("💾 Saving index files...")
+    faiss.write_index(index, gen.path("index"))
+    save_meta(sections, gen.path("meta"))
+    json.dump({"corpus": [s["text"] for s in sections]}, open(gen.path("bm25"), "w", encoding="utf-8"), ensure_ascii=False)
+    save_facets(sections, gen.path("facets"))
+    save_domains(sections, gen.path("domains"))
+    save_positions(sections, gen.path("positions"))
+    return gen.publish(len(sections), stats)
+
+# ------------------ INCREMENTAL UPDATE ------------------
+def update(changed=(), removed=()):
+    """
+    Re-index only the Acts (structured JSON file slugs) in `changed` and drop
+    those in `removed`. Vectors of every other section are reused from the
+    current FAISS index, so only the changed Acts are embedded.
+    """
+    changed, removed = set(changed), set(removed)
+    with GenerationWriter() as gen:  # holds the writer lock: the base can't change under us
+        src = paths(gen.parent)
+        meta = json.load(open(src["meta"], encoding="utf-8"))
+        index = faiss.read_index(src["index"])
+        if index.ntotal != len(meta):
+            raise RuntimeError(f"{src['index']} has {index.ntotal} vectors but {src['meta']} has {len(meta)} rows; run a full build")
+        vectors = index.reconstruct_n(0, index.ntotal)
+
+        keep = [i for i, row in enumerate(meta) if row.get("file") not in changed | removed]
+        prov = load_provenance(DOWNLOAD_LOG, PDF_DIR)
+        fresh = []
+        for slug in sorted(changed):
+            path = os.path.join(DATA_DIR, f"{slug}.json")
+            if os.path.exists(path):
+                fresh.extend(extract_sections(path, prov))
+
+        print(f"🔁 Update: {len(changed)} changed / {len(removed)} removed Acts → "
+              f"{len(meta) - len(keep)} rows dropped, {len(fresh)} new sections")
+
+        sections = [meta[i] for i in keep] + fresh
+        order = sorted(range(len(sections)), key=lambda i: category_order(sections[i]))
+        known = {pos: vectors[keep[i]] for pos, i in enumerate(order) if i < len(keep)}
+        sections = [sections[i] for i in order]
+        embeddings, stats = embed_deduped(sections, known)
+        save_index(gen, sections, embeddings, {"dedup": stats})
+    print(f"✅ Update complete: {len(sections)} sections")
+    return len(fresh)
+
 # ------------------ BUILD ------------------
-print("🔧 Building FAISS + BM25 hybrid index...")
-all_sections = []
-for fname in tqdm(os.listdir(DATA_DIR)):
-    if fname.endswith(".json"):
-        fpath = os.path.join(DATA_DIR, fname)
-        all_sections.extend(list(extract_sections(fpath)))
-
-if not all_sections:
-    print("❌ No valid law sections found.")
-    exit()
-
-texts = [s["text"] for s in all_sections]
-
-# ------------------ EMBEDDINGS ------------------
-print(f"🔹 Generating embeddings for {len(texts)} sections...")
-embeddings = []
-BATCH = 50
-for i in tqdm(range(0, len(texts), BATCH)):
-    batch = texts[i:i + BATCH]
-    emb = client.embeddings.create(model=MODEL_EMB, input=batch)
-    for e in emb.data:
-        embeddings.append(e.embedding)
-
-embeddings = np.array(embeddings, dtype="float32")
-faiss.normalize_L2(embeddings)  # cosine similarity
-
-# ------------------ FAISS INDEX ------------------
-print("🧠 Creating FAISS cosine-similarity index...")
-index = faiss.IndexFlatIP(embeddings.shape[1])
-index.add(embeddings)
-
-# ------------------ BM25 INDEX ------------------
-print("📚 Building BM25 lexical index...")
-tokenized = [t.split() for t in texts]
-bm25 = BM25Okapi(tokenized)
-
-# ------------------ SAVE ------------------
-print("💾 Saving index files...")
-faiss.write_index(index, INDEX_PATH)
-json.dump(all_sections, open(META_PATH, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
-json.dump({"corpus": texts}, open(BM25_PATH, "w", encoding="utf-8"), ensure_ascii=False)
-
-print("\n✅ Build complete!")
-print(f"• FAISS index  → {INDEX_PATH}")
-print(f"• Metadata     → {META_PATH}")
-print(f"• BM25 corpus  → {BM25_PATH}")
-print(f"Total sections → {len(texts)}")
\ No newline at end of file
+def build():
+    print("🔧 Building FAISS + BM25 hybrid index...")
+    prov = load_provenance(DOWNLOAD_LOG, PDF_DIR)
+    all_sections = []
+    for fname in tqdm(os.listdir(DATA_DIR)):
+        if fname.endswith(".json"):
+            fpath = os.path.join(DATA_DIR, fname)
+            all_sections.extend(list(extract_sections(fpath, prov)))
+
+    if not all_sections:
+        print("❌ No valid law sections found.")
+        return
+
+    # Stable sort keeps section order within each Act; category filters then
+    # select one contiguous slice of the vector matrix.
+    all_sections.sort(key=category_order)
+    print(f"🗂️ {len(id_ranges(all_sections))} category ranges over {len(all_sections)} sections")
+
+    texts = [s["text"] for s in all_sections]
+
+    # ------------------ EMBEDDINGS ------------------
+    print(f"🔹 Generating embeddings for {len(texts)} sections (one per near-duplicate cluster)...")
+    embeddings, stats = embed_deduped(all_sections)
+
+    with GenerationWriter() as gen:
+        name = save_index(gen, all_sections, embeddings, {"dedup": stats})
+
+    print("\n✅ Build complete!")
+    print(f"• Generation   → {os.path.join(GEN_ROOT, name)} (FAISS, metadata, BM25, facets, domains, positions)")
+    print(f"• Live pointer → {os.path.join(GEN_ROOT, 'CURRENT')}")
+    print(f"Total sections → {len(texts)}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build the FAISS + BM25 hybrid index.")
+    ap.add_argument("--relink", action="store_true", help="Only refresh viewer link fields in existing metadata")
+    ap.add_argument("--facets", action="store_true", help="Only rebuild facets for existing metadata")
+    ap.add_argument("--provenance", action="store_true", help="Only stamp provenance on existing metadata")
+    ap.add_argument("--domains", action="store_true", help="Only re-tag section domains for existing metadata")
+    ap.add_argument("--positions", action="store_true", help="Only rebuild the positional (phrase) index")
+    ap.add_argument("--update", nargs="+", metavar="SLUG", help="Incrementally re-index these structured JSON slugs")
+    args = ap.parse_args()
+    if args.update:
+        present = {s for s in args.update if os.path.exists(os.path.join(DATA_DIR, f"{s}.json"))}
+        update(changed=present, removed=set(args.update) - present)
+    elif args.relink:
+        relink()
+    elif args.provenance:
+        restamp()
+    elif args.domains:
+        rederive("domains")
+    elif args.facets:
+        rederive("facets")
+    elif args.positions:
+        rederive("positions")
+    else:
+        build()
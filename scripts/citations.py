@@ -0,0 +1,129 @@
+"""
+citations.py
+------------------------------------------------------------
+Purpose:
+    Exact citation lookups ("section 302 PPC", "s. 5 Arms Act 1878",
+    "489-F", "Article 25") without embeddings.
+
+    CitationIndex is built once per index generation from the metadata:
+
+        (law, section key) → row     e.g. ("The_Arms_Act_1878", "5") → 812
+        law name key       → laws    "arms act", "arms act 1878", "ppc", "crpc" ...
+
+    Law keys come from every indexed title (with and without its year)
+    plus the abbreviations in ../law_aliases.json. Section keys are
+    normalised so "489-F", "489 F", "489F" and "Article 25" / "25" meet.
+
+    parse() classifies a query: it is a direct lookup only when, apart
+    from the citation and the Act, it has nothing but filler words
+    ("what is", "text of" ...), and a section cited without an Act exists
+    in exactly one Act. Anything else (an Act name that doesn't resolve,
+    "section 7" of many Acts) goes through normal retrieval.
+------------------------------------------------------------
+"""
+
+import re
+import json
+
+ALIASES_PATH = "../law_aliases.json"
+
+FILLER = {"what", "whats", "is", "are", "the", "of", "under", "in", "a", "an", "to", "say", "says",
+          "show", "me", "text", "explain", "meaning", "read", "give", "does", "define", "pakistan"}
+
+_PREFIX = r"(?:(?i:\b(?:sections?|secs?\.?|s\.|articles?|arts?\.?)|§))\s*"
+_NUMBER = r"(\d+(?:-?[A-Za-z]{1,2}\b|\.[A-Za-z]\b| [A-Z]\b)?)"
+_CITED = re.compile(_PREFIX + _NUMBER)
+_LEADING = re.compile(r"^\W*" + _NUMBER + r"\s+(?=\S)")  # "302 PPC", "489-F PPC"
+_YEAR = re.compile(r"\(?\b(1[6-9]\d\d|20\d\d)\b\)?")
+
+
+def words(text):
+    return [w for w in re.findall(r"[a-z0-9]+", (text or "").lower().replace("’", "'")) if w != "the"]
+
+
+def section_key(section_no):
+    """'489-F' / '489 F' / 'Article 25' / 's. 3A' → '489F' / '489F' / '25' / '3A'."""
+    s = re.sub(r"(?i)^\s*(?:sections?|secs?|s|articles?|arts?|§)\b\.?\s*", "", str(section_no))
+    return re.sub(r"[\s.\-]", "", s).upper()
+
+
+def law_keys(title):
+    """Lookup keys for an indexed law name such as 'The Arms Act (1878)'."""
+    year = _YEAR.search(title)
+    bare = words(_YEAR.sub(" ", title))
+    keys = {" ".join(bare), "".join(bare)}
+    if year:
+        keys |= {" ".join(bare + [year.group(1)])}
+    return {k for k in keys if k}
+
+
+class CitationIndex:
+    def __init__(self, meta, aliases=None):
+        self.sections = {}   # (file, section key) → row
+        self.laws = {}       # law key → [file]
+        self.names = {}      # file → law name
+        for i, m in enumerate(meta):
+            f = m.get("file")
+            if not f:
+                continue
+            self.sections.setdefault((f, section_key(m["section_no"])), i)
+            if f not in self.names:
+                self.names[f] = m["law"]
+                for k in law_keys(m["law"]):
+                    self.laws.setdefault(k, []).append(f)
+        titles = {f: " ".join(words(_YEAR.sub(" ", n))) for f, n in self.names.items()}
+        for alias, pattern in (aliases or {}).items():
+            want = " ".join(words(pattern))
+            hits = [f for f, t in titles.items() if f" {want} " in f" {t} "]
+            hits = [f for f in hits if titles[f] == want] or hits  # prefer the exact title
+            for k in {" ".join(words(alias)), "".join(words(alias))} if hits else ():
+                known = self.laws.setdefault(k, [])
+                known.extend(f for f in hits if f not in known)
+        self.by_section = {}  # section key → [file] (for citations without an Act)
+        for f, s in self.sections:
+            self.by_section.setdefault(s, []).append(f)
+
+    @classmethod
+    def load(cls, meta, path=ALIASES_PATH):
+        try:
+            aliases = json.load(open(path, encoding="utf-8"))["aliases"]
+        except (OSError, ValueError, KeyError):
+            aliases = {}
+        return cls(meta, aliases)
+
+    def resolve_law(self, text):
+        """(files, words used) for the longest law key found in `text`'s words."""
+        toks = words(text)
+        for n in range(min(len(toks), 12), 0, -1):
+            for s in range(0, len(toks) - n + 1):
+                span = toks[s:s + n]
+                for key in (" ".join(span), "".join(span)):
+                    if key in self.laws:
+                        return self.laws[key], set(span)
+        return [], set()
+
+    def parse(self, query):
+        """
+        Rows for a direct citation query, or None when the query isn't one
+        (or cites a section the index doesn't have).
+        """
+        m = _CITED.search(query)
+        if m:
+            sec, rest = m.group(1), query[:m.start()] + " " + query[m.end():]
+        else:
+            m = _LEADING.match(query)
+            if not m:
+                return None
+            sec, rest = m.group(1), query[m.end():]
+        files, used = self.resolve_law(rest)
+        if m.re is not _CITED and not files:
+            return None  # a bare leading number is only a citation when an Act follows
+        if any(w not in used and w not in FILLER for w in words(_YEAR.sub(" ", rest))):
+            return None  # unresolved words, e.g. an Act that isn't indexed: not a plain lookup
+        key = section_key(sec)
+        if not files:
+            files = self.by_section.get(key, [])
+            if len(files) != 1:
+                return None  # "Article 25" alone is ambiguous across Acts
+        rows = [self.sections[(f, key)] for f in files if (f, key) in self.sections]
+        return rows or None
@@ -0,0 +1,91 @@
+"""
+dedup.py
+------------------------------------------------------------
+Purpose:
+    Near-duplicate section detection for the index build (MinHash + LSH).
+
+    Much of the corpus is boilerplate repeated across Acts ("The Federal
+    Government may ... make rules for carrying out the purposes of this
+    Act", "Omitted by the Federal Laws (Revision and Declaration)
+    Ordinance, 1981", indemnity clauses ...). Such sections are clustered
+    so the build embeds one representative per cluster and retrieval can
+    collapse a cluster to its best row.
+
+        section text → word 5-gram shingles → 128 MinHash values
+                     → 16 LSH bands of 8 → candidate pairs sharing a band
+                     → keep pairs with estimated Jaccard ≥ THRESHOLD
+                     → union-find clusters
+
+    With 16×8 bands, pairs at Jaccard 0.8 collide in some band with
+    probability ~0.9; the signature check then drops the false positives.
+------------------------------------------------------------
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16          # NUM_PERM / BANDS rows per band
+SHINGLE = 5         # words per shingle
+THRESHOLD = 0.8     # estimated Jaccard for two sections to count as duplicates
+MAX_BUCKET = 500    # skip degenerate buckets (e.g. empty texts) instead of pairing them all
+
+_P = (1 << 31) - 1  # Mersenne prime for the hash family (products fit in int64)
+_rng = np.random.default_rng(20240601)  # fixed: signatures are comparable across builds
+_A = _rng.integers(1, _P, NUM_PERM, dtype=np.int64)
+_B = _rng.integers(0, _P, NUM_PERM, dtype=np.int64)
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM int64) of a text's word shingles."""
+    words = re.findall(r"\w+", (text or "").lower())
+    shingles = {zlib.crc32(" ".join(words[i:i + SHINGLE]).encode())
+                for i in range(max(1, len(words) - SHINGLE + 1))}
+    x = np.fromiter(shingles, dtype=np.int64, count=len(shingles)) & _P
+    return ((x[:, None] * _A + _B) % _P).min(axis=0)
+
+
+def clusters(texts, threshold=THRESHOLD):
+    """
+    Representative row for every text: rep[i] == i for cluster
+    representatives (the first row of each cluster), else the row whose
+    vector/result stands in for row i.
+    """
+    sigs = np.array([signature(t) for t in texts]) if texts else np.zeros((0, NUM_PERM), dtype=np.int64)
+    parent = list(range(len(texts)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    rows = NUM_PERM // BANDS
+    for b in range(BANDS):
+        buckets = defaultdict(list)
+        for i, band in enumerate(sigs[:, b * rows:(b + 1) * rows]):
+            buckets[band.tobytes()].append(i)
+        for ids in buckets.values():
+            if len(ids) < 2 or len(ids) > MAX_BUCKET:
+                continue
+            for j in ids[1:]:
+                ri, rj = find(ids[0]), find(j)
+                if ri != rj and (sigs[ids[0]] == sigs[j]).mean() >= threshold:
+                    parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(i) for i in range(len(texts))], dtype="int64")
+
+
+def stats(rep):
+    """Cluster summary for a representative array from clusters()."""
+    n, unique = len(rep), int((rep == np.arange(len(rep))).sum())
+    sizes = np.bincount(rep, minlength=n) if n else np.zeros(0, dtype="int64")
+    return {
+        "sections": n,
+        "clusters": int((sizes > 1).sum()),
+        "duplicates": n - unique,
+        "dedup_ratio": round((n - unique) / n, 4) if n else 0.0,
+        "largest_cluster": int(sizes.max()) if n else 0,
+    }
@@ -0,0 +1,79 @@
+"""
+domains.py
+------------------------------------------------------------
+Purpose:
+    Legal-domain tagging for query-time boosts.
+
+    Index time: every section gets a bitmask of the domains whose pattern
+    matches its law name or text (bit i = i-th domain in domains.json),
+    saved next to the metadata.
+    Query time: the query is tagged with the same patterns once, and the
+    boost for a whole candidate set is one vectorized expression:
+
+        boost = exp(bits(section_masks & query_mask) @ log(weights))
+
+    i.e. the product of the weights of the domains shared by the query
+    and each section (1.0 where nothing is shared).
+
+Taxonomy: ../domains.json  ({"domains": [{"name", "pattern", "weight"}, ...]})
+------------------------------------------------------------
+"""
+
+import os
+import re
+import json
+import numpy as np
+
+DOMAINS_PATH = "../domains.json"
+MASKS_PATH = "../pakistan_law_domains.json"
+
+
+class Taxonomy:
+    def __init__(self, domains):
+        if len(domains) > 32:
+            raise ValueError("At most 32 domains fit in a section bitmask")
+        self.names = [d["name"] for d in domains]
+        self.patterns = [re.compile(d["pattern"], re.I) for d in domains]
+        self.log_weights = np.log(np.array([float(d["weight"]) for d in domains], dtype="float32"))
+        self.bits = (1 << np.arange(len(domains))).astype("uint32")
+
+    @classmethod
+    def load(cls, path=DOMAINS_PATH):
+        return cls(json.load(open(path, encoding="utf-8"))["domains"])
+
+    def mask(self, *texts):
+        """Bitmask of the domains matching any of `texts`."""
+        m = 0
+        for i, p in enumerate(self.patterns):
+            if any(t and p.search(t) for t in texts):
+                m |= 1 << i
+        return m
+
+    def tag(self, meta):
+        """uint32 bitmask per metadata row (law name + section text)."""
+        return np.array([self.mask(r.get("law", ""), r.get("text", "")) for r in meta], dtype="uint32")
+
+    def boosts(self, query_mask, section_masks):
+        """Multiplicative boost per section for a query's domain mask."""
+        shared = (np.asarray(section_masks, dtype="uint32") & np.uint32(query_mask))[:, None] & self.bits
+        return np.exp((shared != 0) @ self.log_weights)
+
+
+def save_masks(meta, taxonomy, path=MASKS_PATH):
+    masks = taxonomy.tag(meta)
+    json.dump({"n_rows": len(meta), "domains": taxonomy.names, "masks": masks.tolist()},
+              open(path, "w", encoding="utf-8"))
+    return masks
+
+
+def load_masks(meta, taxonomy, path=MASKS_PATH):
+    """
+    Precomputed section masks, or freshly tagged ones when the file is
+    missing or was built for other rows / another taxonomy.
+    """
+    if os.path.exists(path):
+        saved = json.load(open(path, encoding="utf-8"))
+        if saved.get("n_rows") == len(meta) and saved.get("domains") == taxonomy.names:
+            return np.array(saved["masks"], dtype="uint32")
+    print("⚠️ Domain masks missing or stale; tagging sections now (run build_index_pro.py --domains).")
+    return taxonomy.tag(meta)
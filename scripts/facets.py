@@ -0,0 +1,137 @@
+"""
+facets.py
+------------------------------------------------------------
+Purpose:
+    Law / year / category facets for filtered retrieval.
+
+    build_facets()  – index time: row-id lists per law file slug and per
+                      category, plus one year per row, saved as JSON
+                      next to the metadata.
+    FacetIndex      – query time: turns a filter dict into a boolean
+                      row mask (bitset) for FAISS ID selection and
+                      BM25 posting-list restriction.
+
+Rows are sorted by category at build time, so "category_range" records
+each category's contiguous [start, end) ID range and single-category or
+single-law selections are one slice of the vector matrix.
+
+Filter dict (all keys optional; OR within a key, AND across keys):
+    {"law": ["Banking_Companies_Ordinance_1962"], "category": ["Criminal Laws"],
+     "year_from": 1947, "year_to": 1990}
+------------------------------------------------------------
+"""
+
+import os
+import json
+import numpy as np
+
+from provenance import pdf_stem, load_provenance, id_ranges
+
+
+def law_files(data_dir):
+    """File slug → (year, source pdf stem) for every structured law JSON."""
+    out = {}
+    for fname in os.listdir(data_dir):
+        if not fname.endswith(".json"):
+            continue
+        try:
+            data = json.load(open(os.path.join(data_dir, fname), encoding="utf-8"))
+        except Exception:
+            continue
+        year = data.get("year")
+        out[fname[:-5]] = (int(year) if str(year or "").isdigit() else None, pdf_stem(data.get("source_file")))
+    return out
+
+
+def build_facets(meta, data_dir, log_path):
+    """Facet JSON for metadata rows (rows must carry the 'file' slug)."""
+    files = law_files(data_dir)
+    prov = None if all("categories" in r for r in meta) else load_provenance(log_path)
+    laws, cats, years = {}, {}, []
+    for i, row in enumerate(meta):
+        slug = row.get("file")
+        year, stem = files.get(slug, (None, ""))
+        years.append(year)
+        if slug:
+            laws.setdefault(slug, []).append(i)
+        row_cats = row["categories"] if prov is None else prov.get(stem, {}).get("categories", [])
+        for c in row_cats:
+            cats.setdefault(c, []).append(i)
+    return {"n_rows": len(meta), "law": laws, "category": cats, "year": years,
+            "category_range": id_ranges(meta)}
+
+
+FILTER_KEYS = ("law", "category", "year_from", "year_to")
+
+
+def check_filters(filters):
+    """Raise ValueError unless `filters` is a filter dict (see the module docstring)."""
+    if not isinstance(filters, dict):
+        raise ValueError(f"Filters must be an object with keys {', '.join(FILTER_KEYS)}")
+    unknown = sorted(set(filters) - set(FILTER_KEYS))
+    if unknown:
+        raise ValueError(f"Unknown filter key(s): {', '.join(map(str, unknown))}")
+    for key in ("law", "category"):
+        values = filters.get(key)
+        if values and not (isinstance(values, list) and all(isinstance(v, str) for v in values)):
+            raise ValueError(f"Filter '{key}' must be a list of names")
+    for key in ("year_from", "year_to"):
+        year = filters.get(key)
+        if year and (isinstance(year, bool) or not str(year).isdigit()):
+            raise ValueError(f"Filter '{key}' must be a year, e.g. 1947")
+
+
+class FacetIndex:
+    def __init__(self, facets):
+        n = facets["n_rows"]
+        self.n = n
+        self.law = {k: self._bits(v) for k, v in facets["law"].items()}
+        self.category = {k: self._bits(v) for k, v in facets["category"].items()}
+        self.year = np.array([y if y is not None else -1 for y in facets["year"]], dtype="int32")
+
+    def _bits(self, ids):
+        m = np.zeros(self.n, dtype=bool)
+        m[ids] = True
+        return m
+
+    @classmethod
+    def load(cls, path, n_rows):
+        """FacetIndex from `path`, or None if missing / built for a different index."""
+        if not os.path.exists(path):
+            return None
+        facets = json.load(open(path, encoding="utf-8"))
+        return cls(facets) if facets.get("n_rows") == n_rows else None
+
+    def mask(self, filters):
+        """Boolean row mask for `filters`, or None when nothing is filtered; ValueError if malformed."""
+        if not filters:
+            return None
+        check_filters(filters)
+        m = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        def any_of(table, keys):
+            out = np.zeros(self.n, dtype=bool)
+            for k in keys:
+                if k in table:
+                    out |= table[k]
+            return out
+
+        if filters.get("law"):
+            m = both(m, any_of(self.law, filters["law"]))
+        if filters.get("category"):
+            m = both(m, any_of(self.category, filters["category"]))
+        if filters.get("year_from"):
+            m = both(m, self.year >= int(filters["year_from"]))
+        if filters.get("year_to"):
+            m = both(m, (self.year >= 0) & (self.year <= int(filters["year_to"])))
+        return m
+
+    def values(self):
+        """Available filter values (for UI pickers)."""
+        known = self.year[self.year >= 0]
+        return {"law": sorted(self.law), "category": sorted(self.category),
+                "year_min": int(known.min()) if len(known) else None,
+                "year_max": int(known.max()) if len(known) else None}
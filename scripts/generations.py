@@ -0,0 +1,245 @@
+"""
+generations.py
+------------------------------------------------------------
+Purpose:
+    Versioned, atomically published index generations.
+
+    Every build writes a complete, self-consistent set of index files into
+    a fresh directory and only then flips a one-line pointer to it:
+
+        index_generations/
+            CURRENT                       ← "g000007" (replaced atomically)
+            g000006/  faiss.index  metadata.json  bm25.json
+                      facets.json  domains.json   positions.bin
+                      manifest.json
+            g000007/  ...
+
+    manifest.json records the generation number, parent, section count,
+    build stats (e.g. dedup) and the SHA-256 + size of every file, so
+    readers can verify a generation before serving it. A reader resolves
+    CURRENT once and then only reads that directory, so it can never pair
+    one build's FAISS index with another build's metadata. Older
+    generations are pruned (KEEP newest), never the live one.
+
+    Until the first generation is published, readers fall back to the
+    legacy flat files (../pakistan_law_*.json / .index).
+
+    Writers are serialised by an OS file lock (index_generations/.lock)
+    held from GenerationWriter() until publish()/discard(): a writer reads
+    its base (paths(gen.parent)) under the lock, so no concurrent build
+    (ingest daemon + a manual --facets) can publish in between and be
+    overwritten by stale data, and CURRENT only ever moves forward.
+------------------------------------------------------------
+"""
+
+import os
+import json
+import shutil
+import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from provenance import sha256_file
+
+GEN_ROOT = "../index_generations"
+POINTER = os.path.join(GEN_ROOT, "CURRENT")
+LOCK = os.path.join(GEN_ROOT, ".lock")
+MANIFEST = "manifest.json"
+KEEP = 3  # published generations kept on disk (servers may still be loading an older one)
+
+FILES = {
+    "index": "faiss.index",
+    "meta": "metadata.json",
+    "bm25": "bm25.json",
+    "facets": "facets.json",
+    "domains": "domains.json",
+    "positions": "positions.bin",
+}
+LEGACY = {
+    "index": "../pakistan_law_faiss.index",
+    "meta": "../pakistan_law_metadata.json",
+    "bm25": "../pakistan_law_bm25.json",
+    "facets": "../pakistan_law_facets.json",
+    "domains": "../pakistan_law_domains.json",
+    "positions": "../pakistan_law_positions.bin",
+}
+
+
+def current():
+    """Name of the published generation, or None (legacy flat files)."""
+    try:
+        name = open(POINTER, encoding="utf-8").read().strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def paths(name=None):
+    """{file key: path} for generation `name` (default: the current one, else the legacy files)."""
+    name = name or current()
+    if name is None:
+        return dict(LEGACY)
+    return {k: os.path.join(GEN_ROOT, name, f) for k, f in FILES.items()}
+
+
+def load_manifest(name):
+    return json.load(open(os.path.join(GEN_ROOT, name, MANIFEST), encoding="utf-8"))
+
+
+def verify(name):
+    """Raise ValueError if any file of generation `name` is missing or differs from its manifest."""
+    manifest = load_manifest(name)
+    for fname, info in manifest["files"].items():
+        path = os.path.join(GEN_ROOT, name, fname)
+        if not os.path.exists(path):
+            raise ValueError(f"{name}: {fname} missing")
+        if os.path.getsize(path) != info["bytes"] or sha256_file(path) != info["sha256"]:
+            raise ValueError(f"{name}: {fname} does not match its manifest checksum")
+    return manifest
+
+
+def _number(name):
+    return int(name[1:]) if name and name[0] == "g" and name[1:].isdigit() else 0
+
+
+def _acquire():
+    """Block until this process holds the writer lock; released by _release or on process exit."""
+    f = open(LOCK, "a+")
+    if fcntl:
+        fcntl.flock(f, fcntl.LOCK_EX)
+    else:
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10 s, then raises
+                break
+            except OSError:
+                continue
+    return f
+
+
+def _release(f):
+    if fcntl:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    f.close()
+
+
+class GenerationWriter:
+    """
+    Staging directory for the next generation. Write (or `carry` over) every
+    file in FILES, then `publish()`; an unpublished stage is never visible.
+    Holds the writer lock until publish() or discard(), so read the base via
+    paths(gen.parent) after creating the writer. Use as a context manager
+    to discard the stage (and release the lock) if the build fails.
+    """
+
+    def __init__(self):
+        os.makedirs(GEN_ROOT, exist_ok=True)
+        self._lock = _acquire()
+        self.parent = current()
+        number = max([_number(d.replace(".staging-", "")) for d in os.listdir(GEN_ROOT)] + [0]) + 1
+        while True:
+            # Creating the staging dir reserves the name: concurrent builders
+            # (ingest daemon + a manual --facets) never share or delete one.
+            self.name = "g%06d" % number
+            self.dir = os.path.join(GEN_ROOT, f".staging-{self.name}")
+            try:
+                os.makedirs(self.dir, exist_ok=False)
+            except FileExistsError:
+                number += 1
+                continue
+            if not os.path.exists(os.path.join(GEN_ROOT, self.name)):
+                break
+            os.rmdir(self.dir)  # published meanwhile; ours and still empty
+            number += 1
+
+    def path(self, key):
+        return os.path.join(self.dir, FILES[key])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.discard()  # no-op after publish()
+
+    def _unlock(self):
+        if self._lock:
+            _release(self._lock)
+            self._lock = None
+
+    def discard(self):
+        """Drop this (unpublished) stage and release the writer lock."""
+        if self._lock:
+            shutil.rmtree(self.dir, ignore_errors=True)
+        self._unlock()
+
+    def carry(self, *keys, rebuild=None):
+        """
+        Reuse unchanged files from the current generation (hard link when
+        possible). `rebuild` maps derived file keys to fn(path) writing the
+        file afresh, for parents that predate it (e.g. positions.bin).
+        """
+        src = paths(self.parent)
+        for k in keys:
+            if not os.path.exists(src[k]) and k in (rebuild or {}):
+                rebuild[k](self.path(k))
+                continue
+            if not os.path.exists(src[k]):
+                self.discard()
+                raise RuntimeError(f"Cannot carry {k} over: {src[k]} does not exist. "
+                                   f"Run a full build first (python build_index_pro.py).")
+            try:
+                os.link(src[k], self.path(k))
+            except OSError:
+                shutil.copy2(src[k], self.path(k))
+
+    def publish(self, sections, extra=None):
+        """Make the stage live and return its name; raises (nothing published) if it can't be."""
+        if not self._lock:
+            raise RuntimeError(f"Generation {self.name} was already published or discarded")
+        missing = [f for f in FILES.values() if not os.path.exists(os.path.join(self.dir, f))]
+        if missing:
+            self.discard()
+            raise RuntimeError(f"Generation {self.name} is incomplete: {missing}")
+        if current() != self.parent:  # only possible if a writer bypassed the lock
+            self.discard()
+            raise RuntimeError(f"Generation {self.name} not published: CURRENT moved from "
+                               f"{self.parent} to {current()} while it was built on {self.parent}")
+        manifest = {
+            "generation": _number(self.name),
+            "parent": self.parent,
+            "built": datetime.datetime.now().isoformat(timespec="seconds"),
+            "sections": sections,
+            "files": {f: {"sha256": sha256_file(os.path.join(self.dir, f)),
+                          "bytes": os.path.getsize(os.path.join(self.dir, f))} for f in FILES.values()},
+            **(extra or {}),
+        }
+        with open(os.path.join(self.dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        final = os.path.join(GEN_ROOT, self.name)
+        os.replace(self.dir, final)
+
+        tmp = POINTER + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.name + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, POINTER)  # the atomic flip
+        prune()
+        self._unlock()
+        print(f"🔔 Published index generation {self.name} ({sections} sections) → {final}")
+        return self.name
+
+
+def prune(keep=KEEP):
+    live = current()
+    names = sorted((d for d in os.listdir(GEN_ROOT) if _number(d)), key=_number)
+    for d in names[:-keep]:
+        if d != live:
+            shutil.rmtree(os.path.join(GEN_ROOT, d), ignore_errors=True)
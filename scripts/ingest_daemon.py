@@ -0,0 +1,133 @@
+"""
+ingest_daemon.py
+------------------------------------------------------------
+Purpose:
+    Long-running hot ingest: drop a newly gazetted PDF into
+    pakistan_code_pdfs/ and it becomes searchable without a rebuild or
+    a server restart.
+
+        poll pakistan_code_pdfs/ ──► settled new / changed PDFs
+            └─ pipeline.process     extract → parse → validate (per Act)
+            └─ pipeline.run_index   build_index_pro.update: embed only those
+                                    Acts and publish a new index generation
+                                    (index_generations/, see generations.py)
+        query_law_pro (app.py, ui_app.py) sees the new generation and swaps
+        it in without a restart; view_server.py already re-stats the
+        structured JSON folder on its own.
+
+    The directory is polled (works the same on Windows and Linux). A PDF is
+    ingested only once its size and mtime are unchanged across two polls,
+    so files still being copied in are left alone. A failed index update
+    (e.g. embedding API down) stays pending and is retried on later polls
+    with exponential backoff, whether or not new PDFs arrive.
+
+Usage:
+    python ingest_daemon.py                 # poll every 10 s
+    python ingest_daemon.py --interval 30 --workers 2
+------------------------------------------------------------
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline
+
+# ------------------ CONFIG ------------------
+POLL_SECS = 10
+RETRY_SECS = 30        # first retry of a failed index update
+RETRY_MAX_SECS = 1800  # backoff cap
+
+
+def snapshot(pdf_dir=pipeline.PDF_DIR):
+    """PDF stem → (size, mtime_ns)."""
+    out = {}
+    for e in os.scandir(pdf_dir):
+        if e.is_file() and e.name.lower().endswith(".pdf"):
+            st = e.stat()
+            out[e.name[:-4]] = (st.st_size, st.st_mtime_ns)
+    return out
+
+
+class Ingestor:
+    def __init__(self, workers=2, parse_slots=2):
+        self.state = pipeline.State()
+        if not self.state.items:
+            print("📌 No pipeline state yet; adopting the existing outputs first.")
+            pipeline.adopt(self.state)
+        self.stages = pipeline.make_stages(os.cpu_count() or 2, parse_slots)
+        self.workers = workers
+        self.seen = snapshot()   # what the last poll saw
+        self.ingested = {}       # stem → (size, mtime_ns) last pushed through the pipeline
+        self.index_pending = True  # structured JSON may differ from the index (checked by content hash)
+        self.retry_in, self.retry_at = RETRY_SECS, 0.0
+
+    def settled(self):
+        """Stems whose file is new or changed since ingestion and stable since the last poll."""
+        now = snapshot()
+        ready = [s for s, sig in now.items()
+                 if self.seen.get(s) == sig and self.ingested.get(s) != sig]
+        self.seen = now
+        return sorted(ready)
+
+    def ingest(self, stems):
+        t0 = time.perf_counter()
+        ran, failed = 0, []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {s: pool.submit(pipeline.process, self.state, self.stages, s) for s in stems}
+            for stem, fut in futures.items():
+                try:
+                    ran += bool(fut.result())
+                except Exception as e:
+                    failed.append(stem)
+                    print(f"  ⚠️ {stem}: {e}")
+        if ran:
+            print(f"🧩 {ran} of {len(stems)} PDFs processed in {time.perf_counter() - t0:.1f}s")
+            self.index_pending, self.retry_at = True, 0.0
+        return failed
+
+    def index(self):
+        """Bring the index up to date if pending and not backing off after a failure."""
+        if not self.index_pending or time.monotonic() < self.retry_at:
+            return
+        try:
+            pipeline.run_index(self.state)
+        except Exception as e:  # e.g. embedding API down: retried on a later poll
+            self.retry_at = time.monotonic() + self.retry_in
+            print(f"⚠️ Index update failed: {e} (retrying in {self.retry_in:.0f}s)")
+            self.retry_in = min(self.retry_in * 2, RETRY_MAX_SECS)
+            return
+        self.index_pending, self.retry_in = False, RETRY_SECS
+
+    def run(self, interval=POLL_SECS):
+        print(f"👀 Watching {pipeline.PDF_DIR} every {interval}s (Ctrl+C to stop)")
+        # The first settled() after one interval also catches up on everything
+        # dropped in while the daemon was down, once it has stopped changing.
+        stems = []
+        while True:
+            if stems:
+                self.ingested.update((s, self.seen[s]) for s in stems)
+                for stem in self.ingest(stems):
+                    self.ingested.pop(stem, None)  # retry on a later poll
+            self.index()
+            time.sleep(interval)
+            stems = self.settled()
+            if stems:
+                print(f"📥 {len(stems)} new or changed PDFs: {', '.join(stems[:5])}{' …' if len(stems) > 5 else ''}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch the PDF folder and hot-ingest new Acts into the live index.")
+    ap.add_argument("--interval", type=float, default=POLL_SECS, help="Seconds between directory polls")
+    ap.add_argument("--workers", type=int, default=2, help="PDFs processed in parallel")
+    ap.add_argument("--parse-slots", type=int, default=2, help="Concurrent LLM parse calls")
+    args = ap.parse_args()
+    try:
+        Ingestor(args.workers, args.parse_slots).run(args.interval)
+    except KeyboardInterrupt:
+        print("👋 Ingest daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+lexical.py
+------------------------------------------------------------
+Purpose:
+    Shared tokenizer and a numpy-backed BM25 inverted index.
+    Used by view_server.py (per-Act search) and the retrieval scripts
+    so every lexical path tokenizes text the same way.
+------------------------------------------------------------
+"""
+
+import re
+import bisect
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased word tokens; punctuation never sticks to a term."""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class InvertedIndex:
+    """
+    BM25 over term → (doc ids, term frequencies) posting arrays.
+    Scoring only touches the postings of the query terms, and an optional
+    boolean mask restricts scoring to a subset of documents.
+    """
+
+    def __init__(self, docs, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.n_docs = len(docs)
+
+        postings, doc_len = {}, np.zeros(self.n_docs, dtype="float32")
+        for d, tokens in enumerate(docs):
+            doc_len[d] = len(tokens)
+            counts = {}
+            for t in tokens:
+                counts[t] = counts.get(t, 0) + 1
+            for t, c in counts.items():
+                postings.setdefault(t, ([], []))
+                postings[t][0].append(d)
+                postings[t][1].append(c)
+
+        self.postings = {t: (np.array(ids, dtype="int32"), np.array(tfs, dtype="float32"))
+                         for t, (ids, tfs) in postings.items()}
+        self.terms = sorted(self.postings)
+        avgdl = float(doc_len.mean()) if self.n_docs else 1.0
+        self.norm = k1 * (1 - b + b * doc_len / max(avgdl, 1e-9))
+        self.idf = {t: float(np.log(1 + (self.n_docs - len(ids) + 0.5) / (len(ids) + 0.5)))
+                    for t, (ids, _) in self.postings.items()}
+
+    def expand_prefix(self, prefix, limit=20):
+        """Indexed terms starting with `prefix` (for search-as-you-type)."""
+        i = bisect.bisect_left(self.terms, prefix)
+        out = []
+        while i < len(self.terms) and self.terms[i].startswith(prefix) and len(out) < limit:
+            out.append(self.terms[i])
+            i += 1
+        return out
+
+    def scores(self, terms, mask=None):
+        """BM25 score of every document for `terms` (restricted to `mask` if given)."""
+        s = np.zeros(self.n_docs, dtype="float32")
+        for t in set(terms):
+            if t not in self.postings:
+                continue
+            ids, tf = self.postings[t]
+            if mask is not None:
+                keep = mask[ids]
+                ids, tf = ids[keep], tf[keep]
+            s[ids] += self.idf[t] * tf * (self.k1 + 1) / (tf + self.norm[ids])
+        return s
+
+    def batch_scores(self, queries):
+        """
+        BM25 score matrix (n_queries × n_docs) for many tokenized queries.
+        Work is grouped by term: each posting list is read once and added to
+        every query row that contains the term in one vectorized update.
+        """
+        S = np.zeros((len(queries), self.n_docs), dtype="float32")
+        rows_by_term = {}
+        for r, terms in enumerate(queries):
+            for t in set(terms):
+                if t in self.postings:
+                    rows_by_term.setdefault(t, []).append(r)
+        for t, rows in rows_by_term.items():
+            ids, tf = self.postings[t]
+            contrib = self.idf[t] * tf * (self.k1 + 1) / (tf + self.norm[ids])
+            S[np.ix_(rows, ids)] += contrib
+        return S
+
+    def top(self, terms, k, mask=None):
+        """(doc ids, scores) of the best `k` documents with a positive score."""
+        return top_k(self.scores(terms, mask), k)
+
+
+def top_k(s, k):
+    """(ids, scores) of the `k` largest positive entries of `s`, best first."""
+    hit = np.flatnonzero(s > 0)
+    if len(hit) > k:
+        hit = hit[np.argpartition(-s[hit], k - 1)[:k]]
+    hit = hit[np.argsort(-s[hit], kind="stable")]
+    return hit, s[hit]
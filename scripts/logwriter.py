@@ -0,0 +1,112 @@
+"""
+logwriter.py
+------------------------------------------------------------
+Purpose:
+    Non-blocking JSONL query log. Requests only enqueue a record; one
+    background thread writes batches (one write() per batch, so lines
+    from concurrent requests never interleave), rotates the file by size,
+    and rewrites "latest value" files such as last_context.txt atomically.
+    A ring buffer of recent records serves "Recent Queries" without
+    reading the log file.
+------------------------------------------------------------
+"""
+
+import os
+import json
+import queue
+import atexit
+import threading
+from collections import deque
+
+
+def tail_lines(path, n, block=8192):
+    """Last `n` lines of a file, reading backwards from the end in blocks."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos, data = f.tell(), b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return [ln.decode("utf-8", "replace") for ln in data.splitlines()[-n:] if ln.strip()]
+
+
+class LogWriter:
+    def __init__(self, path, max_bytes=5_000_000, backups=3, flush_secs=1.0, batch=200, recent=50):
+        self.path, self.max_bytes, self.backups = path, max_bytes, backups
+        self.flush_secs, self.batch = flush_secs, batch
+        self.q = queue.Queue()
+        self.recent_records = deque(maxlen=recent)
+        for ln in tail_lines(path, recent):
+            try:
+                self.recent_records.append(json.loads(ln))
+            except ValueError:
+                continue
+        self.thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    # ---------- request side (never touches the disk) ----------
+    def write(self, record, **dumps_kw):
+        self.recent_records.append(record)
+        self.q.put(("append", json.dumps(record, ensure_ascii=False, **dumps_kw) + "\n"))
+
+    def replace(self, path, text):
+        """Overwrite `path` with `text`; only the newest value per batch is written."""
+        self.q.put(("replace", (path, text)))
+
+    def recent(self, n=10):
+        """Newest-first recent records (in-memory ring buffer)."""
+        return list(self.recent_records)[-n:][::-1]
+
+    def flush(self):
+        self.q.join()
+
+    # ---------- writer thread ----------
+    def _run(self):
+        while True:
+            items = [self.q.get()]
+            try:
+                while len(items) < self.batch:
+                    items.append(self.q.get(timeout=self.flush_secs))
+            except queue.Empty:
+                pass
+            try:
+                self._write(items)
+            except Exception as e:
+                print(f"⚠️ Log write failed: {e}")
+            finally:
+                for _ in items:
+                    self.q.task_done()
+
+    def _write(self, items):
+        lines = "".join(v for kind, v in items if kind == "append")
+        replaced = dict(v for kind, v in items if kind == "replace")  # last value per path wins
+
+        if lines:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._rotate_if_needed()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+        for path, text in replaced.items():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+
+    def _rotate_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
@@ -0,0 +1,105 @@
+"""
+packing.py
+------------------------------------------------------------
+Purpose:
+    Token-budgeted context packing for ask().
+    - counts tokens locally (tiktoken if installed, else ~4 chars/token)
+    - walks hits best-first and packs whole sections while they fit
+    - trims long sections to the sentences that best match the query
+    - drops sentences already packed from another hit (repeated
+      boilerplate, overlapping sub-sections)
+------------------------------------------------------------
+"""
+
+import re
+import math
+
+from lexical import tokenize
+
+try:
+    import tiktoken
+    _enc = tiktoken.get_encoding("o200k_base")  # gpt-4o family
+    def count_tokens(text):
+        return len(_enc.encode(text or "", disallowed_special=()))
+except Exception:  # tiktoken missing or encoding unavailable offline
+    def count_tokens(text):
+        return math.ceil(len(text or "") / 4)
+
+SENT_RE = re.compile(r"(?<=[.;:])\s+(?=[(\[A-Z0-9])")
+
+
+def split_sentences(text):
+    return [s.strip() for s in SENT_RE.split(text or "") if s.strip()]
+
+
+def sentence_key(s):
+    return " ".join(tokenize(s))
+
+
+def trim_to_budget(query_terms, sentences, budget):
+    """Keep the highest query-overlap sentences (in original order) within `budget` tokens."""
+    scored = []
+    for i, s in enumerate(sentences):
+        toks = tokenize(s)
+        overlap = len(query_terms & set(toks)) / (1 + math.log(1 + len(toks)))
+        scored.append((overlap, -i, i, s))
+    keep, used = set(), 0
+    for overlap, _, i, s in sorted(scored, reverse=True):
+        n = count_tokens(s)
+        if used + n > budget:
+            continue
+        keep.add(i)
+        used += n
+    out, last = [], -1
+    for i in sorted(keep):
+        if last != -1 and i != last + 1:
+            out.append("…")
+        out.append(sentences[i])
+        last = i
+    return " ".join(out), used
+
+
+def pack(query, hits, budget=3000, section_max=900, header=lambda m: f"[{m['law']} §{m['section_no']}]"):
+    """
+    Pack hits (best-first dicts with "meta") into one context string.
+    Returns (context, packed_hits, stats).
+    """
+    qterms = set(tokenize(query))
+    seen_sents = set()
+    parts, packed = [], []
+    stats = {"tokens": 0, "sections": 0, "trimmed": 0, "deduped_sentences": 0, "skipped": 0}
+
+    for h in hits:
+        m = h["meta"]
+        head = header(m)
+        sents = []
+        for s in split_sentences(m["text"]):
+            k = sentence_key(s)
+            if k and k in seen_sents:
+                stats["deduped_sentences"] += 1
+                continue
+            sents.append(s)
+        if not sents:
+            stats["skipped"] += 1
+            continue
+
+        left = budget - stats["tokens"] - count_tokens(head) - 2
+        if left < 40:
+            break
+        body = " ".join(sents)
+        cap = min(section_max, left)
+        if count_tokens(body) > cap:
+            body, _ = trim_to_budget(qterms, sents, cap)
+            if not body:
+                stats["skipped"] += 1
+                continue
+            stats["trimmed"] += 1
+
+        seen_sents.update(sentence_key(s) for s in split_sentences(body))
+        block = f"{head} {body}"
+        parts.append(block)
+        packed.append(h)
+        stats["tokens"] += count_tokens(block) + 2  # "\n\n" separator
+        stats["sections"] += 1
+
+    return "\n\n".join(parts), packed, stats
@@ -0,0 +1,311 @@
+"""
+pipeline.py
+------------------------------------------------------------
+Purpose:
+    Incremental "make for data" over the whole ingestion chain:
+
+        pakistan_code_pdfs/<stem>.pdf
+          └─ extract  → pakistan_code_texts/<stem>.txt        (extract_texts)
+              └─ parse → pakistan_code_structured/<slug>.json  (llm_parse + rename_files naming)
+                  └─ validate                                  (validate_jsons)
+        all structured JSONs
+          └─ index    → FAISS / metadata / BM25 / facets       (build_index_pro.update)
+
+    Every per-Act stage declares its input (the previous stage's output)
+    and records the SHA-256 of that input in pipeline_state.json. A stage
+    re-runs only when its input hash, its code version or its output
+    changed, so one new PDF costs one extract, one LLM parse and one
+    small embedding batch; the other Acts are untouched.
+
+    Acts flow through the per-Act stages independently on a thread pool
+    (one Act can be parsing while the next is still extracting); per-stage
+    slot limits keep CPU-bound extraction and LLM calls bounded. The index
+    stage runs once at the end over whichever Acts changed.
+
+Usage:
+    python pipeline.py --adopt        # first run: record existing outputs as current
+    python pipeline.py                # run whatever is stale
+    python pipeline.py --dry-run      # show what would run
+    python pipeline.py --only administrator<hash> --workers 8
+------------------------------------------------------------
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from provenance import sha256_file
+from rename_files import safe_filename
+from validate_jsons import validate_json_structure
+
+# ------------------ PATHS ------------------
+PDF_DIR = "../pakistan_code_pdfs"
+TEXT_DIR = "../pakistan_code_texts"
+DATA_DIR = "../pakistan_code_structured"
+STATE_PATH = "../pipeline_state.json"
+
+
+# ------------------ STATE ------------------
+class State:
+    """
+    pipeline_state.json: per-Act stage records, the indexed hash of every
+    structured JSON, and a (size, mtime) → sha256 cache so unchanged files
+    are not re-hashed on every run. Saved atomically after each stage.
+    """
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        data = json.load(open(path, encoding="utf-8")) if os.path.exists(path) else {}
+        self.items = data.get("items", {})
+        self.indexed = data.get("indexed", {})
+        self.hashes = data.get("hashes", {})
+
+    def sha(self, path):
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        with self.lock:
+            cached = self.hashes.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = sha256_file(path)
+        with self.lock:
+            self.hashes[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def get(self, stem, stage):
+        with self.lock:
+            return self.items.get(stem, {}).get(stage)
+
+    def put(self, stem, stage, record):
+        with self.lock:
+            self.items.setdefault(stem, {})[stage] = record
+        self.save()
+
+    def save(self):
+        with self.lock:
+            data = {"items": self.items, "indexed": self.indexed, "hashes": self.hashes}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+
+# ------------------ STAGES ------------------
+def run_extract(stem, pdf_path):
+    from extract_texts import clean_text, extract_blocks  # needs PyMuPDF
+    out = os.path.join(TEXT_DIR, f"{stem}.txt")
+    text = clean_text(extract_blocks(pdf_path))
+    with open(out + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(out + ".tmp", out)
+    return out
+
+
+def structured_name(data, stem):
+    """rename_files naming (law title + year); a clash with another Act gets a stable suffix."""
+    title = (data.get("law_name") or "").strip()
+    if not title or "error" in data:
+        return f"{stem}.json"
+    base = safe_filename(title)
+    name = f"{base}_{data['year']}.json" if data.get("year") else f"{base}.json"
+    path = os.path.join(DATA_DIR, name)
+    if os.path.exists(path):
+        try:
+            other = json.load(open(path, encoding="utf-8")).get("source_file")
+        except Exception:
+            other = None
+        if other != f"{stem}.txt":
+            name = f"{base}_{stem[-6:]}.json"
+    return name
+
+
+def run_parse(stem, text_path):
+    from llm_parse import parse_text_with_llm  # needs OPENAI_API_KEY
+    text = open(text_path, encoding="utf-8").read()
+    data = parse_text_with_llm(text)
+    data["source_file"] = f"{stem}.txt"
+    out = os.path.join(DATA_DIR, structured_name(data, stem))
+    with open(out + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(out + ".tmp", out)
+    return out
+
+
+def run_validate(stem, json_path):
+    data = json.load(open(json_path, encoding="utf-8"))
+    ok, issues, chapters, sections = validate_json_structure(data, os.path.basename(json_path))
+    return {"ok": ok, "issues": issues[:5], "chapters": chapters, "sections": sections}
+
+
+class Stage:
+    """
+    One per-Act step. `run(stem, input_path)` returns the output path (or a
+    result dict for check-only stages); `version` is bumped when the step's
+    logic changes so stored outputs are redone; `slots` bounds how many
+    Acts may be in this stage at once.
+    """
+
+    def __init__(self, name, run, version, slots):
+        self.name, self.run, self.version = name, run, version
+        self.slots = threading.Semaphore(slots)
+
+
+def make_stages(extract_slots, parse_slots):
+    return [
+        Stage("extract", run_extract, "1", extract_slots),
+        Stage("parse", run_parse, "1", parse_slots),
+        Stage("validate", run_validate, "1", 32),
+    ]
+
+
+def output_of(record):
+    out = record.get("out") if record else None
+    return out if isinstance(out, str) else None
+
+
+def is_current(state, stem, stage, input_hash):
+    rec = state.get(stem, stage.name)
+    if not rec or rec.get("in") != input_hash or rec.get("version") != stage.version:
+        return False
+    out = output_of(rec)
+    return out is None if "result" in rec else (out is not None and os.path.exists(out))
+
+
+def process(state, stages, stem, dry_run=False):
+    """Walk one Act through the per-Act stages; returns the stages that ran."""
+    ran = []
+    path = os.path.join(PDF_DIR, f"{stem}.pdf")
+    for stage in stages:
+        if path is None or not os.path.exists(path):
+            break
+        digest = state.sha(path)
+        if is_current(state, stem, stage, digest):
+            path = output_of(state.get(stem, stage.name))
+            continue
+        ran.append(stage.name)
+        if dry_run:
+            break  # later stages depend on this output
+        with stage.slots:
+            t0 = time.perf_counter()
+            out = stage.run(stem, path)
+        record = {"in": digest, "version": stage.version, "secs": round(time.perf_counter() - t0, 2)}
+        if isinstance(out, str):
+            prev = output_of(state.get(stem, stage.name))
+            if prev and prev != out and os.path.exists(prev):
+                os.remove(prev)  # renamed output (e.g. the parsed title changed)
+            record["out"] = out
+            path = out
+        else:
+            record["result"] = out
+            path = None
+        state.put(stem, stage.name, record)
+    return ran
+
+
+# ------------------ INDEX STAGE ------------------
+def index_changes(state):
+    """Structured JSON slugs whose content differs from what is indexed, and slugs that disappeared."""
+    current = {f[:-5]: state.sha(os.path.join(DATA_DIR, f)) for f in os.listdir(DATA_DIR) if f.endswith(".json")}
+    changed = {s for s, h in current.items() if state.indexed.get(s) != h}
+    removed = set(state.indexed) - set(current)
+    return current, changed, removed
+
+
+def run_index(state, dry_run=False):
+    current, changed, removed = index_changes(state)
+    if not changed and not removed:
+        print("📚 Index: up to date")
+        return
+    print(f"📚 Index: {len(changed)} changed, {len(removed)} removed Acts")
+    if dry_run:
+        return
+    import build_index_pro  # needs OPENAI_API_KEY
+    build_index_pro.update(changed=changed, removed=removed)
+    with state.lock:
+        state.indexed = current
+    state.save()
+
+
+def adopt(state):
+    """Record the outputs already on disk as current (no stage is run)."""
+    by_source = {}
+    for f in os.listdir(DATA_DIR):
+        if f.endswith(".json"):
+            try:
+                src = json.load(open(os.path.join(DATA_DIR, f), encoding="utf-8")).get("source_file")
+            except Exception:
+                continue
+            if src:
+                by_source[src[:-4]] = os.path.join(DATA_DIR, f)
+    adopted = 0
+    for pdf in sorted(os.listdir(PDF_DIR)):
+        stem = pdf[:-4]
+        txt = os.path.join(TEXT_DIR, f"{stem}.txt")
+        js = by_source.get(stem)
+        if not pdf.endswith(".pdf") or not os.path.exists(txt) or not js:
+            continue
+        for stage, inp, out in (("extract", os.path.join(PDF_DIR, pdf), txt), ("parse", txt, js)):
+            state.items.setdefault(stem, {})[stage] = {"in": state.sha(inp), "version": "1", "out": out}
+        adopted += 1
+    state.indexed = index_changes(state)[0]
+    state.save()
+    print(f"📌 Adopted {adopted} Acts and {len(state.indexed)} indexed JSONs as current → {state.path}")
+
+
+# ------------------ MAIN ------------------
+def main():
+    ap = argparse.ArgumentParser(description="Incremental PDF → text → JSON → index pipeline.")
+    ap.add_argument("--only", nargs="+", metavar="STEM", help="Limit to these PDF stems")
+    ap.add_argument("--workers", type=int, default=4, help="Acts in flight at once")
+    ap.add_argument("--extract-slots", type=int, default=os.cpu_count() or 2, help="Concurrent PDF extractions")
+    ap.add_argument("--parse-slots", type=int, default=4, help="Concurrent LLM parse calls")
+    ap.add_argument("--dry-run", action="store_true", help="Only report which stages are stale")
+    ap.add_argument("--adopt", action="store_true", help="Mark existing outputs as current and exit")
+    ap.add_argument("--no-index", action="store_true", help="Skip the index stage")
+    args = ap.parse_args()
+
+    state = State()
+    if args.adopt:
+        adopt(state)
+        return
+
+    stems = sorted(f[:-4] for f in os.listdir(PDF_DIR) if f.lower().endswith(".pdf"))
+    if args.only:
+        stems = [s for s in stems if s in set(args.only)]
+    stages = make_stages(args.extract_slots, args.parse_slots)
+
+    t0 = time.perf_counter()
+    counts, failed = {}, []
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(process, state, stages, s, args.dry_run): s for s in stems}
+        for fut in as_completed(futures):
+            stem = futures[fut]
+            try:
+                ran = fut.result()
+            except Exception as e:
+                failed.append(stem)
+                print(f"  ⚠️ {stem}: {e}")
+                continue
+            for name in ran:
+                counts[name] = counts.get(name, 0) + 1
+            if ran:
+                print(f"  {'would run' if args.dry_run else '✔'} {stem}: {' → '.join(ran)}")
+    print(f"🧩 {len(stems)} Acts checked in {time.perf_counter() - t0:.1f}s • "
+          f"stages run: {counts or 'none'} • failed: {len(failed)}")
+
+    for stem in stems:
+        rec = state.get(stem, "validate")
+        if rec and not rec["result"]["ok"]:
+            print(f"  ⚠️ {stem}: {', '.join(rec['result']['issues'])}")
+
+    if not args.no_index:
+        run_index(state, args.dry_run)
+    print(f"✅ Pipeline finished in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
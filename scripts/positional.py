@@ -0,0 +1,301 @@
+"""
+positional.py
+------------------------------------------------------------
+Purpose:
+    Positional inverted index over section bodies for exact phrase,
+    proximity and boolean queries ("without lawful excuse",
+    "arms NEAR/5 licence", "bail AND NOT (cancel OR cancellation)").
+
+    Built by build_index_pro.py with the same tokenizer as BM25
+    (lexical.tokenize) and stored per generation as positions.bin.
+    Every term's postings are three varint streams, all gap-encoded:
+
+        docs       doc-id gaps                  e.g. 3 17 42   → 3 14 25
+        tfs        occurrences per doc
+        positions  token offsets within each doc, restarting per doc
+
+    Decoding is vectorised (numpy), so even the commonest terms cost well
+    under a millisecond. Phrase and NEAR matching work on "hit keys"
+    doc << 32 | position, which sort by doc and then by position:
+
+        phrase  keys of term i shifted back by i, intersected
+        NEAR/n  keys of A within n tokens of some key of B (searchsorted)
+
+Query syntax (search / match):
+    "exact phrase"   term   A NEAR/n B   A AND B   A B (= AND)   A OR B
+    NOT A   ( ... )      operators must be upper-case
+------------------------------------------------------------
+"""
+
+import re
+import json
+import struct
+
+import numpy as np
+
+from lexical import tokenize
+
+MAGIC = b"PKPOS1\n"
+SHIFT = 32  # hit key = doc << SHIFT | position
+NEAR_DEFAULT = 10
+MAX_PHRASES = 8  # word pairs of an unquoted query used as phrase signals
+STOP = {"a", "an", "and", "any", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+        "or", "shall", "that", "the", "this", "to", "under", "what", "which", "with"}
+
+
+# ------------------ VARINT ------------------
+def encode(values):
+    """LEB128 varint bytes for non-negative integers."""
+    out = bytearray()
+    for v in values:
+        v = int(v)
+        while v >= 0x80:
+            out.append((v & 0x7F) | 0x80)
+            v >>= 7
+        out.append(v)
+    return bytes(out)
+
+
+def decode(buf):
+    """int64 array from varint bytes (vectorised)."""
+    a = np.frombuffer(buf, dtype=np.uint8)
+    if not len(a):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(a < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shift = 7 * (np.arange(len(a)) - np.repeat(starts, ends - starts + 1))
+    return np.add.reduceat((a & 0x7F).astype(np.int64) << shift, starts)
+
+
+# ------------------ INDEX ------------------
+class PositionalIndex:
+    """Term → compressed (docs, tfs, positions) postings; see the module docstring."""
+
+    def __init__(self, lexicon, blob, n_docs):
+        self.lexicon = lexicon  # term → [offset, doc bytes, tf bytes, position bytes, df]
+        self.blob = blob
+        self.n_docs = n_docs
+
+    @classmethod
+    def build(cls, texts):
+        postings = {}
+        for d, text in enumerate(texts):
+            seen = {}
+            for p, t in enumerate(tokenize(text)):
+                seen.setdefault(t, []).append(p)
+            for t, pos in seen.items():
+                postings.setdefault(t, []).append((d, pos))
+
+        lexicon, parts, offset = {}, [], 0
+        for t in sorted(postings):
+            docs = [d for d, _ in postings[t]]
+            gaps = [p - q for _, pos in postings[t] for p, q in zip(pos, [0] + pos[:-1])]
+            streams = (encode(np.diff(docs, prepend=0)), encode(len(pos) for _, pos in postings[t]), encode(gaps))
+            lexicon[t] = [offset, *(len(s) for s in streams), len(docs)]
+            parts.extend(streams)
+            offset += sum(len(s) for s in streams)
+        return cls(lexicon, b"".join(parts), len(texts))
+
+    def save(self, path):
+        head = json.dumps({"n_docs": self.n_docs, "lexicon": self.lexicon}, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(head)) + head + self.blob)
+
+    @classmethod
+    def load(cls, path, n_docs):
+        """PositionalIndex from `path`, or None if missing / built for a different index."""
+        try:
+            data = open(path, "rb").read()
+        except OSError:
+            return None
+        if not data.startswith(MAGIC):
+            return None
+        n = struct.unpack_from("<Q", data, len(MAGIC))[0]
+        start = len(MAGIC) + 8
+        head = json.loads(data[start:start + n].decode("utf-8"))
+        if head["n_docs"] != n_docs:
+            return None
+        return cls(head["lexicon"], memoryview(data)[start + n:], n_docs)
+
+    def stats(self):
+        return {"terms": len(self.lexicon), "bytes": len(self.blob),
+                "postings": sum(e[4] for e in self.lexicon.values())}
+
+    # ------------------ POSTINGS ------------------
+    def postings(self, term):
+        """(doc ids, tfs, positions) for a term; positions are grouped per doc in doc order."""
+        e = self.lexicon.get(term)
+        if e is None:
+            z = np.zeros(0, dtype=np.int64)
+            return z, z, z
+        o, nd, nt, np_, _ = e
+        docs = np.cumsum(decode(self.blob[o:o + nd]))
+        tfs = decode(self.blob[o + nd:o + nd + nt])
+        gaps = decode(self.blob[o + nd + nt:o + nd + nt + np_])
+        run = np.cumsum(gaps)
+        first = np.cumsum(tfs) - tfs  # index of each doc's first position
+        pos = run - np.repeat(run[first] - gaps[first], tfs)  # restart the running sum per doc
+        return docs, tfs, pos
+
+    def keys(self, term):
+        """Sorted hit keys (doc << SHIFT | position) of one term."""
+        docs, tfs, pos = self.postings(term)
+        return (np.repeat(docs, tfs) << SHIFT) | pos
+
+    def phrase_keys(self, terms):
+        """Hit keys of every occurrence of the term sequence (key of its first word)."""
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        # rarest term first: its keys bound the candidate set
+        order = sorted(range(len(terms)), key=lambda i: self.lexicon.get(terms[i], [0] * 5)[4])
+        out = None
+        for i in order:
+            k = self.keys(terms[i])
+            k = k[(k & ((1 << SHIFT) - 1)) >= i] - i
+            out = k if out is None else np.intersect1d(out, k, assume_unique=True)
+            if not len(out):
+                break
+        return out
+
+    def phrase(self, terms):
+        """(doc ids, match counts) of documents containing the exact term sequence."""
+        docs, counts = np.unique(self.phrase_keys(terms) >> SHIFT, return_counts=True)
+        return docs, counts
+
+    def near(self, a, b, n=NEAR_DEFAULT):
+        """Hit keys of `a` within n tokens (either side) of some hit of `b` (both key arrays)."""
+        if not len(a) or not len(b):
+            return np.zeros(0, dtype=np.int64)
+        lo = np.searchsorted(b, a - n)
+        hi = np.searchsorted(b, a + n, side="right")
+        return a[hi > lo]  # positions < 2**SHIFT - n, so a window never crosses into another doc
+
+    def phrase_hits(self, phrases, mask=None):
+        """{doc id: share of `phrases` (token lists) it contains verbatim}, restricted to `mask`."""
+        out = {}
+        for terms in phrases:
+            docs, _ = self.phrase(terms)
+            if mask is not None:
+                docs = docs[mask[docs]]
+            for d in docs.tolist():
+                out[d] = out.get(d, 0.0) + 1.0 / len(phrases)
+        return out
+
+    # ------------------ QUERIES ------------------
+    def match(self, query, mask=None):
+        """Sorted doc ids matching a phrase / NEAR / boolean query (restricted to `mask`)."""
+        docs = _Parser(self, query).parse()
+        if mask is not None:
+            docs = docs[mask[docs]]
+        return docs
+
+    def search(self, query, k=20, mask=None):
+        """
+        (doc ids, scores) of the best `k` matching documents, scored by how
+        many times the query's phrases / terms occur in them.
+        """
+        parser = _Parser(self, query)
+        docs = parser.parse()
+        if mask is not None:
+            docs = docs[mask[docs]]
+        score = np.zeros(len(docs), dtype="float32")
+        for keys in parser.positive:
+            d, c = np.unique(keys >> SHIFT, return_counts=True)
+            hit = np.isin(docs, d)
+            score[hit] += c[np.searchsorted(d, docs[hit])]
+        top = np.argsort(-score, kind="stable")[:k]
+        return docs[top], score[top]
+
+
+def query_phrases(query):
+    """
+    Phrase signals of a free-text query: its "quoted" phrases, else its
+    adjacent word pairs ("lawful excuse", "non bailable") that are not
+    both stop words.
+    """
+    quoted = [tokenize(q) for q in re.findall(r'"([^"]+)"', query)]
+    quoted = [q for q in quoted if len(q) > 1]
+    if quoted:
+        return quoted
+    toks = tokenize(query)
+    pairs = dict.fromkeys((a, b) for a, b in zip(toks, toks[1:]) if not (a in STOP and b in STOP))
+    return [list(p) for p in pairs][:MAX_PHRASES]
+
+
+_TOKEN = re.compile(r'"[^"]*"|\(|\)|NEAR/\d+|NEAR\b|AND\b|OR\b|NOT\b|[^\s()"]+')
+
+
+class _Parser:
+    """
+    Recursive-descent parser/evaluator. Atoms (terms, phrases, NEAR chains)
+    evaluate to hit keys; AND / OR / NOT to sorted doc-id arrays.
+    """
+
+    def __init__(self, index, query):
+        self.index = index
+        self.toks = _TOKEN.findall(query)
+        self.i = 0
+        self.positive = []  # hit keys of non-negated atoms (for scoring)
+        self.negated = 0
+
+    def peek(self):
+        return self.toks[self.i] if self.i < len(self.toks) else None
+
+    def take(self):
+        tok = self.peek()
+        self.i += 1
+        return tok
+
+    def parse(self):
+        if not self.toks:
+            return np.zeros(0, dtype=np.int64)
+        docs = self.or_expr()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected {self.peek()!r} in search query")
+        return docs
+
+    def or_expr(self):
+        docs = self.and_expr()
+        while self.peek() == "OR":
+            self.take()
+            docs = np.union1d(docs, self.and_expr())
+        return docs
+
+    def and_expr(self):
+        docs = self.not_expr()
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            docs = np.intersect1d(docs, self.not_expr(), assume_unique=True)
+        return docs
+
+    def not_expr(self):
+        if self.peek() == "NOT":
+            self.take()
+            self.negated += 1
+            docs = self.not_expr()
+            self.negated -= 1
+            return np.setdiff1d(np.arange(self.index.n_docs), docs, assume_unique=True)
+        if self.peek() == "(":
+            self.take()
+            docs = self.or_expr()
+            if self.take() != ")":
+                raise ValueError("Unbalanced parentheses in search query")
+            return docs
+        return np.unique(self.near_expr() >> SHIFT)
+
+    def near_expr(self):
+        keys = self.atom()
+        while self.peek() and self.peek().startswith("NEAR"):
+            n = int(self.take()[5:] or NEAR_DEFAULT)
+            other = self.atom()
+            keys = np.union1d(self.index.near(keys, other, n), self.index.near(other, keys, n))
+        if not self.negated:
+            self.positive.append(keys)
+        return keys
+
+    def atom(self):
+        tok = self.take()
+        if tok is None or tok in ("(", ")", "AND", "OR", "NOT") or tok.startswith("NEAR"):
+            raise ValueError(f"Expected a term or \"phrase\" in search query, got {tok!r}")
+        return self.index.phrase_keys(tokenize(tok.strip('"')))
@@ -0,0 +1,109 @@
+"""
+provenance.py
+------------------------------------------------------------
+Purpose:
+    Carry scraper provenance (category, act page URL, PDF hash) from
+    download_log.csv through to the section metadata.
+
+    The chain extract_texts → llm_parse keeps only the PDF's file stem
+    (structured JSON "source_file": "administrator<hash>.txt"), so the
+    join key is that stem:
+
+        download_log.csv pdf_url  ─┐
+                                   ├─ stem → {category_id, category,
+        pakistan_code_pdfs/*.pdf  ─┘          act_url, pdf_sha256}
+
+    build_index_pro.py stamps these fields on every section row and sorts
+    rows by category so each category occupies one contiguous ID range.
+------------------------------------------------------------
+"""
+
+import os
+import re
+import csv
+import hashlib
+
+PROVENANCE_FIELDS = ("category_id", "category", "act_url", "pdf_sha256")
+
+
+def pdf_stem(path_or_url):
+    """'pakistan_code_pdfs\\administratorab12.pdf' / '.../administratorab12.txt' → 'administratorab12'."""
+    base = re.split(r"[\\/]", path_or_url or "")[-1]
+    return os.path.splitext(base)[0]
+
+
+def sha256_file(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_log(log_path):
+    """PDF stem → list of download_log.csv rows (an Act can sit in several categories)."""
+    rows = {}
+    if not os.path.exists(log_path):
+        return rows
+    with open(log_path, "r", encoding="utf-8", newline="") as f:
+        for r in csv.DictReader(f):
+            stem = pdf_stem(r.get("pdf_url") or r.get("saved_path"))
+            if stem:
+                rows.setdefault(stem, []).append(r)
+    return rows
+
+
+def load_provenance(log_path, pdf_dir=None):
+    """
+    PDF stem → provenance dict. The first logged category is the Act's
+    primary category (used for ordering); `categories` lists all of them.
+    `pdf_sha256` is filled only when the PDF is present in `pdf_dir`.
+    """
+    out = {}
+    for stem, rows in load_log(log_path).items():
+        cats = []
+        for r in rows:
+            if r.get("category_title") and r["category_title"] not in cats:
+                cats.append(r["category_title"])
+        first = rows[0]
+        cid = first.get("category_id") or ""
+        prov = {
+            "category_id": int(cid) if cid.isdigit() else None,
+            "category": cats[0] if cats else None,
+            "categories": cats,
+            "act_url": first.get("act_url") or None,
+            "pdf_sha256": None,
+        }
+        pdf = os.path.join(pdf_dir, stem + ".pdf") if pdf_dir else None
+        if pdf and os.path.exists(pdf):
+            prov["pdf_sha256"] = sha256_file(pdf)
+        out[stem] = prov
+    return out
+
+
+def stamp(row, prov):
+    """Copy provenance fields onto a section row (missing provenance → nulls)."""
+    prov = prov or {}
+    for k in PROVENANCE_FIELDS:
+        row[k] = prov.get(k)
+    row["categories"] = list(prov.get("categories") or [])
+    return row
+
+
+def category_order(row):
+    """Sort key that groups rows by primary category, uncategorised last."""
+    cid = row.get("category_id")
+    return (cid is None, cid if cid is not None else 0, row.get("file") or "")
+
+
+def id_ranges(meta, key="category"):
+    """{value: [start, end)} for values whose rows are contiguous in `meta`."""
+    spans, broken = {}, set()
+    for i, row in enumerate(meta):
+        v = row.get(key)
+        if v is None:
+            continue
+        if v in spans and spans[v][1] != i:
+            broken.add(v)
+        spans[v] = [spans.get(v, [i])[0], i + 1]
+    return {v: s for v, s in spans.items() if v not in broken}
@@ -5,13 +5,14 @@ Retrieves and synthesizes grounded answers across ALL Pakistan Code laws.
 Intelligently weights domain relevance instead of restricting categories.
 """
 
-import os, json, faiss, numpy as np, re
+import os, json, faiss, numpy as np
 from openai import OpenAI
 from numpy.linalg import norm
+from domains import Taxonomy, load_masks
+from generations import paths
 
 # ==== CONFIG ====
-INDEX_PATH = "../pakistan_law_faiss.index"
-META_PATH  = "../pakistan_law_metadata.json"
+INDEX_FILES = paths()  # current index generation (one consistent set of files)
 EMBED_MODEL = "text-embedding-3-large"
 TOP_K = 25
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -27,45 +28,32 @@ def cosine(a, b):
     return float(np.dot(a, b) / (norm(a) * norm(b)))
 
 # ==== LOAD INDEX ====
-index = faiss.read_index(INDEX_PATH)
-metas = json.load(open(META_PATH, encoding="utf-8"))
+index = faiss.read_index(INDEX_FILES["index"])
+metas = json.load(open(INDEX_FILES["meta"], encoding="utf-8"))
 
 # ==== AUTO DOMAIN WEIGHTING ====
-def get_domain_boosts(query):
-    """Return regex-based domain boosts depending on topic."""
-    domain_boosts = []
-    mapping = {
-        "motor|vehicle|insurance|road|traffic": 1.3,
-        "bank|loan|finance|currency|securities": 1.25,
-        "marriage|divorce|inheritance|family": 1.2,
-        "tax|duty|import|customs": 1.25,
-        "crime|penal|theft|murder|offence": 1.3,
-        "education|university|school|college": 1.15,
-        "health|epidemic|disease|drug|hospital": 1.15
-    }
-    for pattern, weight in mapping.items():
-        if re.search(pattern, query, re.I):
-            domain_boosts.append((re.compile(pattern, re.I), weight))
-    return domain_boosts
+# Taxonomy lives in ../domains.json; section bitmasks are precomputed by
+# build_index_pro.py so a query only runs each pattern once, on itself.
+taxonomy = Taxonomy.load()
+domain_masks = load_masks(metas, taxonomy, INDEX_FILES["domains"])
 
 # ==== MAIN PIPELINE ====
 def ask_question(query):
     print(f"\n🔎 Query: {query}")
     query_vec = get_embedding(query)
     D, I = index.search(np.array([query_vec]), TOP_K)
-    hits = [metas[i] for i in I[0] if i < len(metas)]
+    ids = [int(i) for i in I[0] if 0 <= i < len(metas)]
+    hits = [metas[i] for i in ids]
 
     # Rerank by cosine similarity
-    for h in hits:
-        h["similarity"] = cosine(get_embedding(h["text"]), query_vec)
+    sims = np.array([cosine(get_embedding(h["text"]), query_vec) for h in hits], dtype="float32")
 
     # Apply domain-based weighting (boost relevance)
-    boosts = get_domain_boosts(query)
-    if boosts:
-        for h in hits:
-            for pattern, weight in boosts:
-                if pattern.search(h["law"]) or pattern.search(h["text"]):
-                    h["similarity"] *= weight
+    query_mask = taxonomy.mask(query)
+    if query_mask:
+        sims *= taxonomy.boosts(query_mask, domain_masks[ids])
+    for h, s in zip(hits, sims):
+        h["similarity"] = float(s)
 
     # Sort and select top hits
     hits = sorted(hits, key=lambda x: x["similarity"], reverse=True)[:5]
@@ -1,134 +1,447 @@
 """
-Pakistan Law Assistant – Professional Edition v6.4
+Pakistan Law Assistant – Professional Edition v6.5
 Now with improved hybrid weighting, relevance filtering, and clean citations.
+Retrieval: FAISS ∪ BM25 candidate pool → pluggable rerank stage → top-N to the LLM.
+New index generations (index_generations/CURRENT, see generations.py) are swapped in without a restart.
 """
-import os, json, faiss, numpy as np, datetime, re
+import os, json, faiss, numpy as np, datetime, time, threading
+from collections import OrderedDict
 from openai import OpenAI
-from rank_bm25 import BM25Okapi
+from lexical import tokenize, top_k, InvertedIndex
+from rerank import get_reranker
+from tracing import start_trace
+from logwriter import LogWriter
+from packing import pack, count_tokens
+from facets import FacetIndex, check_filters
+from citations import CitationIndex
+from positional import PositionalIndex, query_phrases
+import generations
 
-INDEX_PATH = "../pakistan_law_faiss.index"
-META_PATH  = "../pakistan_law_metadata.json"
-BM25_PATH  = "../pakistan_law_bm25.json"
 LOG_PATH   = "../logs/query_log.jsonl"
 CONTEXT_LOG = "../logs/last_context.txt"
 
 MODEL_EMB  = "text-embedding-3-large"
 MODEL_CHAT = "gpt-4o-mini"
-TOP_K      = 20
+FAISS_POOL = 100   # dense candidates
+BM25_POOL  = 100   # lexical candidates (union with the dense ones)
+PHRASE_POOL = 50   # sections containing the query's phrases verbatim (union as well)
+TOP_N      = 5     # sections the confidence score is averaged over
+PACK_POOL  = 12    # reranked hits offered to the context packer
+CONTEXT_BUDGET = int(os.getenv("PAKLAW_CONTEXT_BUDGET", "3000"))  # prompt tokens for context
+SECTION_MAX = 900  # longer sections are trimmed to their most query-relevant sentences
+MIN_SCORE  = 0.15  # blend-score floor for a hit to count as relevant
+RERANKER   = os.getenv("PAKLAW_RERANKER", "blend")
+SUBSET_SCAN = 0.25  # filters keeping fewer rows than this share are scored directly
+DENSE_MODE = os.getenv("PAKLAW_DENSE", "flat")  # "flat" = all sections; "hier" = top Acts first
+ACT_POOL   = 20    # Acts whose sections are searched in "hier" mode
+EMB_CACHE_SIZE = 512  # recent query embeddings kept in memory (UI reruns repeat queries)
+RELOAD_SECS = 5    # how often index_generations/CURRENT is checked for a new generation
+CITATION_FAST_PATH = os.getenv("PAKLAW_CITATIONS", "1") != "0"  # "section 302 PPC" → hash lookup, no embedding
 BASE_URL   = "http://127.0.0.1:5002/view"
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-idx = faiss.read_index(INDEX_PATH)
-meta = json.load(open(META_PATH, encoding="utf-8"))
-corpus = json.load(open(BM25_PATH, encoding="utf-8"))["corpus"]
-bm25 = BM25Okapi([c.split() for c in corpus])
+class Generation:
+    """
+    One published index generation, loaded and verified as a unit: FAISS
+    index, metadata, BM25, facets and a zero-copy view of the vectors.
+    Immutable once loaded; a query pins one instance for its whole run.
+    """
+
+    def __init__(self, name=None):
+        self.name = name or generations.current() or "legacy"
+        if self.name == "legacy":
+            files = generations.LEGACY
+        else:
+            files = generations.paths(self.name)
+            generations.verify(self.name)
+        self.idx = faiss.read_index(files["index"])
+        self.meta = json.load(open(files["meta"], encoding="utf-8"))
+        if self.idx.ntotal != len(self.meta):
+            raise ValueError(f"{self.name}: {self.idx.ntotal} vectors but {len(self.meta)} metadata rows")
+        corpus = json.load(open(files["bm25"], encoding="utf-8"))["corpus"]
+        self.bm25 = InvertedIndex([tokenize(c) for c in corpus])
+        self.positions = PositionalIndex.load(files["positions"], len(self.meta))
+        if self.positions is None:  # generation from before positions.bin
+            self.positions = PositionalIndex.build(corpus)
+        self.facets = FacetIndex.load(files["facets"], len(self.meta))
+        self.xb = faiss.rev_swig_ptr(self.idx.get_xb(), self.idx.ntotal * self.idx.d).reshape(self.idx.ntotal, self.idx.d)  # zero-copy view
+        self.groups = {}  # dup_group → rows sharing one near-duplicate text (see dedup.py)
+        for i, m in enumerate(self.meta):
+            if "dup_group" in m:
+                self.groups.setdefault(m["dup_group"], []).append(i)
+
+        # Act level: each Act's row ids (not a range: rows need not be
+        # contiguous after --update / --relink, and unlinked rows are grouped
+        # by law name); its vector is the normalised centroid of those rows.
+        acts = {}
+        for i, m in enumerate(self.meta):
+            acts.setdefault(m.get("file") or ("law", m["law"]), []).append(i)
+        self.act_files = [k if isinstance(k, str) else None for k in acts]  # file slug, None if unlinked
+        self.act_rows = [np.array(r, dtype="int64") for r in acts.values()]
+        self.act_vecs = np.array([self.xb[r].mean(axis=0) for r in self.act_rows], dtype="float32").reshape(-1, self.idx.d)
+        if len(self.act_vecs):
+            faiss.normalize_L2(self.act_vecs)
+        self.citations = CitationIndex.load(self.meta)  # (law, section_no) → row, see citations.py
+
+_live = Generation()  # RCU reference: readers take it once, reloads replace it whole
+_reload_lock, _rejected = threading.Lock(), set()
+query_log = LogWriter(LOG_PATH)  # background writer; ask() never blocks on disk
+
+def live():
+    """The generation new queries run on (pin it when batching several calls)."""
+    return _live
+
+def reload_if_changed():
+    """
+    Load the generation CURRENT points at, if it's newer, and publish it
+    with one reference assignment. Queries already running keep the old
+    object until they finish; it is freed when the last one drops it.
+    """
+    global _live
+    with _reload_lock:  # one loader at a time, so generations only move forward
+        name = generations.current()
+        if name is None or name == _live.name or name in _rejected:
+            return False
+        try:
+            gen = Generation(name)
+        except Exception as e:  # corrupt / pruned generation: keep serving the old one
+            _rejected.add(name)
+            print(f"⚠️ Index generation {name} not loaded: {e}")
+            return False
+        _live = gen
+    print(f"🔄 Index generation {name} live: {gen.idx.ntotal} sections")
+    return True
+
+def watch_generation(interval=RELOAD_SECS):
+    def loop():
+        while True:
+            time.sleep(interval)
+            reload_if_changed()
+    threading.Thread(target=loop, name="index-generation-watch", daemon=True).start()
+
+watch_generation()
 
-def emb(txt):
-    e = client.embeddings.create(model=MODEL_EMB, input=txt[:8000]).data[0].embedding
-    v = np.array(e, dtype="float32").reshape(1, -1)
+_emb_cache, _emb_lock = OrderedDict(), threading.Lock()
+
+def emb(txt, trace=None):
+    key = txt[:8000]
+    with _emb_lock:
+        v = _emb_cache.get(key)
+        if v is not None:
+            _emb_cache.move_to_end(key)
+    if trace:
+        trace.cache_result("embedding", v is not None)
+    if v is not None:
+        return v
+
+    resp = client.embeddings.create(model=MODEL_EMB, input=key)
+    if trace:
+        trace.tokens_from("embed", resp.usage)
+    v = np.array(resp.data[0].embedding, dtype="float32").reshape(1, -1)
     faiss.normalize_L2(v)
+    with _emb_lock:
+        _emb_cache[key] = v
+        if len(_emb_cache) > EMB_CACHE_SIZE:
+            _emb_cache.popitem(last=False)
     return v
 
 def safe_json(o):
     if isinstance(o, np.generic): return o.item()
     raise TypeError(f"Type {type(o).__name__} not serializable")
 
-def link(law, sec):
+def link(m):
     """
-    Builds a valid, file-safe URL to the viewer for a given law and section.
-    Automatically normalizes naming and skips missing JSONs.
+    Viewer URL for a metadata row. The target file and section anchor are
+    resolved once by build_index_pro.py; rows without them (law file not in
+    pakistan_code_structured) get a plain-text citation instead of a dead link.
     """
-    # Clean law name — remove underscores before parentheses, normalize everything
-    law_clean = re.sub(r'_*\((\d{4})\)', r'_\1', law)
-    law_clean = re.sub(r'[()]+', '', law_clean)
-    law_clean = re.sub(r'[^A-Za-z0-9_]+', '_', law_clean)
-    law_clean = re.sub(r'_+', '_', law_clean).strip('_')
+    if m.get("file"):
+        return f"{BASE_URL}?law={m['file']}&section={m['anchor']}"
+    return f"{m['law']} §{m['section_no']}"
+
+def lap(timings, stage, t0):
+    """Add the ms since t0 to timings[stage] (if timing is on); returns now."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (now - t0) * 1000
+    return now
 
-    # Check if corresponding JSON exists
-    structured_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../pakistan_code_structured"))
-    json_path = os.path.join(structured_dir, f"{law_clean}.json")
+def facet_values():
+    """Filter choices for UIs ({} when facets were not built)."""
+    facets = _live.facets
+    return facets.values() if facets else {}
 
-    # Only build link if the file exists
-    if os.path.exists(json_path):
-        return f"{BASE_URL}?law={law_clean}&section={sec}"
+def filter_mask(filters, gen=None):
+    """Boolean row mask for a filter dict (see facets.py), or None for no filter."""
+    if not filters:
+        return None
+    check_filters(filters)  # also when the generation has no facets
+    facets = (gen or _live).facets
+    if facets is None:
+        raise ValueError("Filters need facets in the index generation (run build_index_pro.py --facets)")
+    return facets.mask(filters)
+
+def top_scored(sims, ids, k):
+    """(scores, ids) of the k best entries of `sims`, best first."""
+    top = np.argpartition(-sims, k - 1)[:k] if len(ids) > k else np.arange(len(ids))
+    top = top[np.argsort(-sims[top])]
+    return sims[top], ids[top]
+
+def act_search(qv, n=ACT_POOL, gen=None):
+    """(scores, Act indices) of the n Acts whose centroids best match qv."""
+    gen = gen or _live
+    return top_scored(gen.act_vecs @ qv[0], np.arange(len(gen.act_files)), n)
+
+def related_acts(query, n=5, qv=None):
+    """[(file slug or None, law name, score)] for the Acts closest to a query (Act-level vectors)."""
+    gen = _live
+    scores, acts = act_search(emb(query) if qv is None else qv, n, gen)
+    return [(gen.act_files[a], gen.meta[gen.act_rows[a][0]]["law"], float(s)) for s, a in zip(scores, acts)]
+
+def hierarchical_search(qv, k, acts=ACT_POOL, gen=None):
+    """Coarse-to-fine: top `acts` Acts by centroid, then top-k sections among their rows."""
+    gen = gen or _live
+    _, top = act_search(qv, acts, gen)
+    ids = np.concatenate([gen.act_rows[a] for a in top]) if len(top) else np.zeros(0, dtype="int64")
+    return top_scored(gen.xb[ids] @ qv[0], ids, k)
+
+def dense_search(qv, k, mask=None, gen=None, mode=None):
+    """
+    FAISS top-k, optionally restricted to `mask`. Contiguous ID ranges and
+    small selections are scored directly against their stored vectors;
+    larger scattered ones use an ID selector. Unfiltered searches in "hier"
+    mode (DENSE_MODE) go through the Act level first.
+    """
+    gen = gen or _live
+    idx, xb = gen.idx, gen.xb
+    if mask is None:
+        if (mode or DENSE_MODE) == "hier" and len(gen.act_files):
+            return hierarchical_search(qv, k, gen=gen)
+        D, I = idx.search(qv, k)
+        return D[0], I[0]
+    ids = np.flatnonzero(mask)
+    if len(ids) and ids[-1] - ids[0] + 1 == len(ids):
+        sims = xb[ids[0]:ids[-1] + 1] @ qv[0]  # contiguous range (e.g. one category): no gather
+    elif len(ids) < SUBSET_SCAN * idx.ntotal:
+        sims = xb[ids] @ qv[0]
     else:
-        # Skip dead link, return plain text fallback (no hyperlink)
-        return f"{law} §{sec}"
-
-def ask(query, urdu=False, return_hits=False):
-    qv = emb(query)
-    D, I = idx.search(qv, TOP_K)
-
-    # --- Hybrid Weighted Merge (FAISS 0.7 + BM25 0.3) ---
-    faiss_hits = {i: float(1 / (1 + D[0][k])) for k, i in enumerate(I[0]) if i < len(meta)}
-    bm25_scores = bm25.get_scores(query.split())
-    bm25_norm = np.interp(bm25_scores, (bm25_scores.min(), bm25_scores.max()), (0, 1))
-
-    combined = {}
-    for i, m in enumerate(meta):
-        s = 0.0
-        if i in faiss_hits:
-            s += 0.7 * faiss_hits[i]
-        s += 0.3 * bm25_norm[i]
-        if s > 0:
-            combined[m["law"] + "_" + m["section_no"]] = {"meta": m, "score": s}
-
-    # --- Boost for keyword overlaps ---
-    qwords = set(re.findall(r"\w+", query.lower()))
-    for v in combined.values():
-        law_words = set(v["meta"]["law"].lower().split())
-        if len(qwords & law_words) > 0:
-            v["score"] *= 1.3
-
-    # --- Filter & sort ---
-    hits = [v for v in combined.values() if v["score"] > 0.15]
-    hits = sorted(hits, key=lambda x: x["score"], reverse=True)[:5]
-    conf = float(np.mean([h["score"] for h in hits])) if hits else 0.0
-
-    # --- Context for LLM ---
-    context = "\n\n".join([
-        f"[{h['meta']['law']} §{h['meta']['section_no']}] {h['meta']['text']}"
+        sel = faiss.IDSelectorBatch(ids.astype("int64"))
+        D, I = idx.search(qv, k, params=faiss.SearchParameters(sel=sel))
+        return D[0], I[0]
+    return top_scored(sims, ids, k)
+
+def candidates(query, qv, faiss_pool=FAISS_POOL, bm25_pool=BM25_POOL, timings=None, pre=None, mask=None, gen=None):
+    """
+    Union of the dense, lexical and phrase-match top lists, each with all scores filled in.
+    `pre` = (D row, I row, BM25 scores) lets batch callers pass results of one
+    matrix FAISS search / multi-query BM25 pass instead of searching per query.
+    `mask` restricts both searches to the rows selected by a filter.
+    """
+    gen = gen or _live
+    meta, xb = gen.meta, gen.xb
+    t = time.perf_counter()
+    D, I = (pre[0], pre[1]) if pre else dense_search(qv, faiss_pool, mask, gen)
+    dense = {int(i): float(d) for d, i in zip(D, I) if 0 <= i < len(meta)}
+    t = lap(timings, "faiss", t)
+
+    lex_all = pre[2] if pre else gen.bm25.scores(tokenize(query), mask)
+    lex_ids, _ = top_k(lex_all, bm25_pool) if bm25_pool else ([], None)
+    t = lap(timings, "bm25", t)
+
+    # Verbatim phrase matches ("without lawful excuse", "non bailable")
+    phrase = gen.positions.phrase_hits(query_phrases(query), mask)
+    phrase_ids = sorted(phrase, key=lambda i: (-phrase[i], -lex_all[i]))[:PHRASE_POOL]
+    t = lap(timings, "phrase", t)
+
+    # Lexical-only candidates get their exact cosine from the stored vectors
+    for i in (set(np.asarray(lex_ids).tolist()) | set(phrase_ids)) - dense.keys():
+        dense[i] = float(xb[i] @ qv[0])
+    t = lap(timings, "faiss", t)
+
+    cands, seen = [], set()
+    for i in sorted(dense, key=dense.get, reverse=True):
+        m = meta[i]
+        # near-duplicate boilerplate collapses to its best-scoring row
+        key = ("dup", m["dup_group"]) if "dup_group" in m else m["law"] + "_" + m["section_no"]
+        if key in seen:
+            continue
+        seen.add(key)
+        cands.append({"id": i, "meta": m, "dense": dense[i], "lex": float(lex_all[i]), "phrase": phrase.get(i, 0.0)})
+    lap(timings, "fusion", t)
+    return cands
+
+def retrieve(query, qv=None, reranker=None, top_n=TOP_N, faiss_pool=FAISS_POOL, bm25_pool=BM25_POOL,
+             timings=None, pre=None, filters=None, gen=None):
+    """
+    Candidate pool → rerank → top_n hits ({"meta", "score", "rerank"}).
+    Pass a dict as `timings` to get per-stage ms (embed, faiss, bm25, phrase, fusion, rerank).
+    `filters` (law / category / year range) restricts retrieval to matching rows.
+    The whole call runs on one index generation: `gen`, else the live one.
+    """
+    gen = gen or _live
+    t = time.perf_counter()
+    if qv is None:
+        qv = emb(query)
+        t = lap(timings, "embed", t)
+    mask = filter_mask(filters, gen)
+    lap(timings, "filter", t)
+    if mask is not None and not mask.any():
+        return []
+    cands = candidates(query, qv, faiss_pool, bm25_pool, timings, pre, mask, gen)
+    if not cands:
+        return []
+
+    t = time.perf_counter()
+    # Blend score doubles as the 0–1 confidence shown in the UI
+    blend = get_reranker("blend").score(query, cands)
+    keep = [k for k in range(len(cands)) if blend[k] > MIN_SCORE]
+    if not keep:
+        return []
+    cands = [cands[k] for k in keep]
+    blend = blend[keep]
+    t = lap(timings, "fusion", t)
+
+    rr = get_reranker(reranker or RERANKER)
+    order = blend if rr.name == "blend" else rr.score(query, cands)
+    top = np.argsort(-order, kind="stable")[:top_n]
+    lap(timings, "rerank", t)
+    return [{"meta": cands[k]["meta"], "score": float(blend[k]), "rerank": float(order[k]),
+             **also(cands[k], gen)} for k in top]
+
+def lookup(query, filters=None, gen=None):
+    """
+    Hits for a direct citation query ("s. 5 Arms Act 1878", "Article 25"),
+    straight from the citation index — no embedding, FAISS or BM25. None
+    when the query isn't a citation or nothing it cites passes `filters`.
+    """
+    gen = gen or _live
+    rows = gen.citations.parse(query)
+    if not rows:
+        return None
+    mask = filter_mask(filters, gen)
+    rows = [i for i in rows if mask is None or mask[i]]
+    return [{"meta": gen.meta[i], "score": 1.0, "rerank": 1.0, **also({"id": i, "meta": gen.meta[i]}, gen)}
+            for i in rows] or None
+
+def quote(hits):
+    """Markdown for cited sections returned verbatim (fast path without explanation)."""
+    return "\n\n---\n\n".join(
+        f"### 📜 {h['meta']['law']} §{h['meta']['section_no']} — {h['meta'].get('section_title', '')}\n\n"
+        f"{h['meta'].get('text', '')}\n\n🔗 {link(h['meta'])}"
         for h in hits
-    ])
-    os.makedirs(os.path.dirname(CONTEXT_LOG), exist_ok=True)
-    open(CONTEXT_LOG, "w", encoding="utf-8").write(context)
+    )
+
+def search(query, k=20, filters=None, gen=None):
+    """
+    Exact phrase / NEAR / boolean search over section bodies (no embedding):
+    '"lawful excuse" NEAR/5 arms', 'bail AND NOT cancellation'. Returns
+    [{"meta", "score"}] with score = occurrences of the query's phrases.
+    """
+    gen = gen or _live
+    ids, scores = gen.positions.search(query, k, filter_mask(filters, gen))
+    return [{"meta": gen.meta[i], "score": float(s)} for i, s in zip(ids.tolist(), scores)]
+
+def also(cand, gen):
+    """{"also": [metadata of the other rows in the hit's near-duplicate cluster]}, or {}."""
+    rows = gen.groups.get(cand["meta"].get("dup_group"), ())
+    return {"also": [gen.meta[j] for j in rows if j != cand["id"]]} if len(rows) > 1 else {}
+
+def recent_queries(n=10):
+    """Newest-first recent log records, from memory (seeded from the log tail at startup)."""
+    return query_log.recent(n)
+
+def answer(query, hits, urdu=False, trace=None):
+    """
+    Pack context from reranked hits and run the chat (and optional Urdu) call.
+    Returns (markdown output, confidence, packed hits, context, log fields).
+    """
+    trace = trace or start_trace()
+
+    # --- Context for LLM: pack as many high-scoring sections as the budget allows ---
+    with trace.span("pack"):
+        context, hits, packing = pack(query, hits, budget=CONTEXT_BUDGET, section_max=SECTION_MAX)
+    conf = float(np.mean([h["score"] for h in hits[:TOP_N]])) if hits else 0.0
 
     # --- GPT reasoning ---
     sys = ("You are a Pakistani legal assistant. Use only the provided context. "
            "Respond clearly and structured:\n"
            "1️⃣ Summary Answer\n2️⃣ Relevant Acts or Sections\n3️⃣ Legal Interpretation")
-    ans = client.chat.completions.create(
-        model=MODEL_CHAT,
-        messages=[
-            {"role": "system", "content": sys},
-            {"role": "user", "content": f"Q: {query}\n\nContext:\n{context}"}
-        ],
-        temperature=0.3
-    ).choices[0].message.content
+    user = f"Q: {query}\n\nContext:\n{context}"
+    prompt_tokens = count_tokens(sys) + count_tokens(user)
+    with trace.span("chat"):
+        resp = client.chat.completions.create(
+            model=MODEL_CHAT,
+            messages=[
+                {"role": "system", "content": sys},
+                {"role": "user", "content": user}
+            ],
+            temperature=0.3
+        )
+    trace.tokens_from("chat", resp.usage)
+    chat_usage = resp.usage
+    ans = resp.choices[0].message.content
+    answer_ms = (time.perf_counter() - trace.t0) * 1000
 
     if urdu:
-        ur = client.chat.completions.create(
-            model=MODEL_CHAT,
-            messages=[{"role": "user", "content": f"Translate to Urdu:\n{ans}"}]
-        ).choices[0].message.content
+        with trace.span("translate"):
+            resp = client.chat.completions.create(
+                model=MODEL_CHAT,
+                messages=[{"role": "user", "content": f"Translate to Urdu:\n{ans}"}]
+            )
+        trace.tokens_from("translate", resp.usage)
+        ur = resp.choices[0].message.content
         ans += f"\n\n🇵🇰 **Urdu Translation:**\n{ur}"
 
     # --- Citations ---
     cites = "<br>".join([
-        f"• <a href='{link(h['meta']['law'], h['meta']['section_no'])}' target='_blank' "
-        f"style='color:#41b97a;font-weight:600;text-decoration:none;'>"
-        f"{h['meta']['law']} §{h['meta']['section_no']}</a> — {h['meta'].get('section_title','')}"
+        (f"• <a href='{link(h['meta'])}' target='_blank' "
+         f"style='color:#41b97a;font-weight:600;text-decoration:none;'>"
+         f"{h['meta']['law']} §{h['meta']['section_no']}</a>"
+         if h['meta'].get('file') else f"• {link(h['meta'])}")
+        + f" — {h['meta'].get('section_title','')}"
+        + (f" <i>(same text in {len(h['also'])} other sections)</i>" if h.get("also") else "")
         for h in hits
     ])
     output = f"### 🧠 Legal Response\n{ans}\n\n---\n**Confidence:** {conf:.2f}\n\n📚 <b>Top Retrieved Sections:</b><br>{cites}"
 
-    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps({
-            "time": datetime.datetime.now().isoformat(timespec='seconds'),
-            "query": query, "confidence": round(conf, 3),
-            "laws": [h['meta']['law'] for h in hits]
-        }, ensure_ascii=False, default=safe_json) + "\n")
+    record = {
+        "prompt_tokens": getattr(chat_usage, "prompt_tokens", None) or prompt_tokens,
+        "context": packing,
+        "time_to_answer_ms": round(answer_ms, 1),
+    }
+    return output, conf, hits, context, record
+
+def ask(query, urdu=False, return_hits=False, reranker=None, filters=None, explain=True):
+    """
+    Answer a query. Direct citations ("section 489-F PPC") skip retrieval:
+    the cited section is returned as is, or with `explain` handed to the
+    LLM as the only context; everything else runs the hybrid pipeline.
+    """
+    if filters:
+        check_filters(filters)  # a malformed filter fails before any embedding call
+    trace = start_trace()
+    gen = _live
+    with trace.span("citation"):
+        hits = lookup(query, filters, gen) if CITATION_FAST_PATH else None
+    route = "citation" if hits else "retrieval"
+    if hits and not explain:
+        output, conf, context, record = quote(hits), 1.0, "", {}
+    else:
+        if not hits:
+            with trace.span("embed"):
+                qv = emb(query, trace)
+            hits = retrieve(query, qv=qv, reranker=reranker, top_n=PACK_POOL, timings=trace.spans, filters=filters, gen=gen)
+        output, conf, hits, context, record = answer(query, hits, urdu=urdu, trace=trace)
+        query_log.replace(CONTEXT_LOG, context)
+
+    query_log.write({
+        "time": datetime.datetime.now().isoformat(timespec='seconds'),
+        "query": query, "confidence": round(conf, 3), "route": route,
+        **({"filters": filters} if filters else {}),
+        "laws": [h['meta']['law'] for h in hits],
+        **record,
+        **trace.finish()
+    }, default=safe_json)
 
-    return (output, conf, hits) if return_hits else (output, conf)
\ No newline at end of file
+    return (output, conf, hits) if return_hits else (output, conf)
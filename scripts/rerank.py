@@ -0,0 +1,132 @@
+"""
+rerank.py
+------------------------------------------------------------
+Purpose:
+    Pluggable rerank stage for query_law_pro.retrieve().
+    Every reranker takes the query and the candidate pool
+    (dicts with "meta", "dense", "lex", "phrase") and returns one score per
+    candidate; higher is better.
+
+Rerankers:
+    blend          – 0.7 dense + 0.3 lexical, x1.3 on Act-title overlap,
+                     up to x1.3 for query phrases found verbatim
+    cross-encoder  – local sentence-transformers CrossEncoder, batched
+                     over a thread pool under a latency budget
+------------------------------------------------------------
+"""
+
+import re
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class BlendReranker:
+    """The original hand-tuned fusion, on cosine (not 1/(1+D)) dense scores."""
+
+    name = "blend"
+
+    def __init__(self, w_dense=0.7, w_lex=0.3, title_boost=1.3, phrase_boost=1.3):
+        self.w_dense, self.w_lex, self.title_boost, self.phrase_boost = w_dense, w_lex, title_boost, phrase_boost
+
+    def _predict(self, pairs, deadline):
+        est = self.batch_s or 0.0
+        if time.perf_counter() + est > deadline:
+            return None  # would finish past the budget: don't occupy a worker
+        t = time.perf_counter()
+        out = self.model.predict(pairs)
+        took = time.perf_counter() - t
+        self.batch_s = took if self.batch_s is None else 0.8 * self.batch_s + 0.2 * took
+        return out
+
+    def score(self, query, cands):
+        dense = np.array([c["dense"] for c in cands], dtype="float32")
+        lex = np.array([c["lex"] for c in cands], dtype="float32")
+        lex_max = lex.max() if len(lex) else 0.0
+        s = self.w_dense * np.clip(dense, 0, 1) + self.w_lex * (lex / lex_max if lex_max > 0 else lex)
+
+        qwords = set(re.findall(r"\w+", query.lower()))
+        boost = np.array([1.0 + (self.title_boost - 1.0) * bool(qwords & set(c["meta"]["law"].lower().split()))
+                          for c in cands], dtype="float32")
+        phrase = np.array([c.get("phrase", 0.0) for c in cands], dtype="float32")  # share of query phrases matched
+        return s * boost * (1.0 + (self.phrase_boost - 1.0) * phrase)
+
+
+class CrossEncoderReranker:
+    """
+    Scores (query, section) pairs with a local cross-encoder on CPU.
+    Candidates arrive best-first from the blend stage and are split into
+    batches scored in parallel; batches not scored within the budget keep
+    their blend order below every cross-scored candidate. Only as many
+    batches as the budget can cover (by the running batch time estimate)
+    are submitted, and a batch that would start too late to finish is
+    skipped, so a slow query never leaves the pool busy for the next one.
+    """
+
+    name = "cross-encoder"
+
+    def __init__(self, model="cross-encoder/ms-marco-MiniLM-L-6-v2",
+                 batch=16, workers=4, budget_ms=400, max_chars=1500):
+        from sentence_transformers import CrossEncoder  # optional dependency
+        self.model = CrossEncoder(model, device="cpu")
+        self.batch, self.budget_ms, self.max_chars = batch, budget_ms, max_chars
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.batch_s = None  # moving average of one batch's model time
+        self.fallback = BlendReranker()
+
+    def _predict(self, pairs, deadline):
+        est = self.batch_s or 0.0
+        if time.perf_counter() + est > deadline:
+            return None  # would finish past the budget: don't occupy a worker
+        t = time.perf_counter()
+        out = self.model.predict(pairs)
+        took = time.perf_counter() - t
+        self.batch_s = took if self.batch_s is None else 0.8 * self.batch_s + 0.2 * took
+        return out
+
+    def score(self, query, cands):
+        base = self.fallback.score(query, cands)
+        order = np.argsort(-base, kind="stable")
+        pairs = [(query, f"{cands[i]['meta'].get('section_title', '')}\n{cands[i]['meta']['text'][:self.max_chars]}")
+                 for i in order]
+
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        starts = range(0, len(pairs), self.batch)
+        if self.batch_s:  # best-first batches the workers can finish in time (at least one)
+            starts = starts[:max(1, int(self.workers * (self.budget_ms / 1000) / self.batch_s))]
+        futures = {self.pool.submit(self._predict, pairs[k:k + self.batch], deadline): k for k in starts}
+        ce = np.full(len(cands), np.nan, dtype="float32")
+        pending = set(futures)
+        while pending:
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for f in done:
+                k, out = futures[f], f.result()
+                if out is not None:
+                    ce[order[k:k + self.batch]] = out
+        for f in pending:
+            f.cancel()
+
+        scored = ~np.isnan(ce)
+        if not scored.any():
+            return base
+        # Unscored candidates sit below the lowest cross-encoder score, in blend order
+        floor = ce[scored].min() - 1.0
+        return np.where(scored, ce, floor + base - base.max())
+
+
+RERANKERS = {r.name: r for r in (BlendReranker, CrossEncoderReranker)}
+_instances = {}
+
+
+def get_reranker(name="blend", **kw):
+    """Shared instance per (name, options); models load once per process."""
+    key = (name, tuple(sorted(kw.items())))
+    if key not in _instances:
+        if name not in RERANKERS:
+            raise ValueError(f"Unknown reranker '{name}' (have: {', '.join(RERANKERS)})")
+        _instances[key] = RERANKERS[name](**kw)
+    return _instances[key]
@@ -0,0 +1,157 @@
+"""
+tracing.py
+------------------------------------------------------------
+Purpose:
+    Lightweight per-request stage timing for the ask() pipeline plus a
+    process-wide Prometheus-style metrics registry (histograms and
+    counters, text exposition format) served by app.py at /metrics.
+
+Overhead:
+    A sampled request costs two perf_counter() calls per stage and one
+    locked histogram update per stage when it finishes. Unsampled requests
+    skip both. Set PAKLAW_TRACE_SAMPLE (0.0–1.0) or call set_sample_rate()
+    to trace only a fraction of requests during high-QPS periods.
+------------------------------------------------------------
+"""
+
+import os
+import time
+import bisect
+import random
+import threading
+from contextlib import contextmanager
+
+SAMPLE_RATE = float(os.getenv("PAKLAW_TRACE_SAMPLE", "1.0"))
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Histograms and counters keyed by (metric name, sorted label items)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = Histogram()
+            h.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        fmt = lambda labels: ",".join(f'{k}="{v}"' for k, v in labels)
+        out, typed = [], set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in self.help:
+                    out.append(f"# HELP {name} {self.help[name]}")
+                out.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), v in sorted(self.counters.items()):
+                header(name, "counter")
+                out.append(f"{name}{{{fmt(labels)}}} {v}" if labels else f"{name} {v}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                header(name, "histogram")
+                base = fmt(labels) + ("," if labels else "")
+                cum = 0
+                for le, c in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    cum += c
+                    out.append(f'{name}_bucket{{{base}le="{le}"}} {cum}')
+                out.append(f"{name}_sum{{{fmt(labels)}}} {h.sum:.6f}")
+                out.append(f"{name}_count{{{fmt(labels)}}} {h.count}")
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+REGISTRY.describe("paklaw_stage_duration_seconds", "Time spent per ask() pipeline stage.")
+REGISTRY.describe("paklaw_tokens_total", "OpenAI tokens used, by call and kind.")
+REGISTRY.describe("paklaw_cache_total", "Cache lookups by cache and result.")
+REGISTRY.describe("paklaw_requests_total", "ask() calls, by whether they were traced.")
+
+
+def set_sample_rate(rate):
+    global SAMPLE_RATE
+    SAMPLE_RATE = min(max(float(rate), 0.0), 1.0)
+
+
+class Trace:
+    """
+    Per-request span timings (ms), token counts and cache results.
+    `spans` is a plain dict so it can be handed to retrieve(timings=...).
+    """
+
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.spans = {} if sampled else None
+        self.tokens = {}
+        self.cache = {}
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name):
+        if not self.sampled:
+            yield
+            return
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + (time.perf_counter() - t) * 1000
+
+    def tokens_from(self, call, usage):
+        """Record an OpenAI `usage` object under `call` (chat, translate, embed)."""
+        if usage is None:
+            return
+        for kind in ("prompt_tokens", "completion_tokens"):
+            n = getattr(usage, kind, None)
+            if n:
+                self.tokens[f"{call}_{kind}"] = n
+                REGISTRY.inc("paklaw_tokens_total", n, call=call, kind=kind.split("_")[0])
+
+    def cache_result(self, cache, hit):
+        self.cache[cache] = "hit" if hit else "miss"
+        REGISTRY.inc("paklaw_cache_total", cache=cache, result="hit" if hit else "miss")
+
+    def finish(self):
+        """Publish span timings to the histograms; returns the log record fields."""
+        REGISTRY.inc("paklaw_requests_total", traced=str(self.sampled).lower())
+        if not self.sampled:
+            return {}
+        self.spans["total"] = (time.perf_counter() - self.t0) * 1000
+        for stage, ms in self.spans.items():
+            REGISTRY.observe("paklaw_stage_duration_seconds", ms / 1000, stage=stage)
+        return {"spans_ms": {k: round(v, 2) for k, v in self.spans.items()},
+                "tokens": self.tokens, "cache": self.cache}
+
+
+def start_trace():
+    return Trace(SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE)
@@ -1,44 +1,43 @@
-import streamlit as st, json, os, re
-from query_law_pro import ask, LOG_PATH
+import streamlit as st, re
+from query_law_pro import ask, link, recent_queries, facet_values, related_acts
 
 def prettify(n): return re.sub(r'\.json$','',n).replace('_',' ').title()
 
-ACT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__),"../pakistan_code_structured"))
-ACTS = [f for f in os.listdir(ACT_DIR) if f.endswith(".json")]
-
-def related(q, n=5):
-    qw=set(re.findall(r'\w+',q.lower())); lst=[]
-    for f in ACTS:
-        title=prettify(f); tw=set(title.lower().split())
-        c=len(qw&tw)
-        if c>0: lst.append((f,title,c))
-    return sorted(lst,key=lambda x:x[2],reverse=True)[:n]
-
 st.set_page_config(page_title="Pakistan Law Assistant", page_icon="⚖️", layout="wide")
 st.markdown("<h2 style='text-align:center;'>🇵🇰 Pakistan Law Assistant</h2>", unsafe_allow_html=True)
 st.caption("Professional Hybrid Retrieval • FAISS + BM25 + GPT-4o")
 
 st.sidebar.header("🕘 Recent Queries")
-if os.path.exists(LOG_PATH):
-    for l in reversed(open(LOG_PATH,"r",encoding="utf-8").readlines()[-10:]):
-        try:j=json.loads(l);st.sidebar.markdown(f"• **{j['query']}**<br><small>Conf: {j['confidence']:.2f}</small>",unsafe_allow_html=True)
-        except:continue
-else:st.sidebar.write("No history yet.")
+recent=recent_queries(10)
+for j in recent:
+    try:st.sidebar.markdown(f"• **{j['query']}**<br><small>Conf: {j['confidence']:.2f}</small>",unsafe_allow_html=True)
+    except:continue
+if not recent:st.sidebar.write("No history yet.")
+
+fv=facet_values(); filters={}
+if fv:
+    st.sidebar.header("🔎 Filters")
+    cats=st.sidebar.multiselect("Category",fv["category"])
+    laws=st.sidebar.multiselect("Act",fv["law"],format_func=prettify)
+    if cats:filters["category"]=cats
+    if laws:filters["law"]=laws
+    if fv["year_min"] and fv["year_max"]:
+        yr=st.sidebar.slider("Year",fv["year_min"],fv["year_max"],(fv["year_min"],fv["year_max"]))
+        if yr!=(fv["year_min"],fv["year_max"]):filters["year_from"],filters["year_to"]=yr
 
 q=st.text_area("💬 Enter your legal question:",height=100)
 urdu=st.toggle("🇵🇰 Translate Answer to Urdu")
 
 if q.strip():
-    rel=related(q)
+    rel=related_acts(q)  # Act-level vectors; the query embedding is cached for ask()
     if rel:
         st.sidebar.markdown("### 📘 Related Acts")
-        for f,t,_ in rel:
-            law=os.path.splitext(f)[0]
-            st.sidebar.markdown(f"[{t}](http://127.0.0.1:5002/view?law={law})",unsafe_allow_html=True)
+        for law,t,_ in rel:
+            st.sidebar.markdown(f"[{t}](http://127.0.0.1:5002/view?law={law})" if law else t,unsafe_allow_html=True)
 
 if st.button("Ask",type="primary"):
     with st.spinner("Analyzing legal context..."):
-        ans,conf,hits=ask(q,urdu=urdu,return_hits=True)
+        ans,conf,hits=ask(q,urdu=urdu,return_hits=True,filters=filters)
 
     pct=min(max(int(conf*100),0),100)
     col="#4CAF50" if pct>70 else "#FFC107" if pct>40 else "#F44336"
@@ -51,4 +50,5 @@ if st.button("Ask",type="primary"):
         st.subheader("📚 Top Retrieved Sections:")
         for h in hits:
             law=h["meta"]["law"]; sec=h["meta"]["section_no"]
-            st.markdown(f"• **[{law} §{sec}](http://127.0.0.1:5002/view?law={law}&section={sec})** — {h['meta'].get('section_title','')}",unsafe_allow_html=True)
\ No newline at end of file
+            cite=f"[{law} §{sec}]({link(h['meta'])})" if h["meta"].get("file") else link(h["meta"])  # plain text when there is no viewer page
+            st.markdown(f"• **{cite}** — {h['meta'].get('section_title','')}",unsafe_allow_html=True)
\ No newline at end of file
@@ -4,15 +4,33 @@ Features:
 ✅ Auto Table of Contents when no section param is provided.
 ✅ Client-side search box for filtering sections by keywords.
 ✅ Compatible with URLs generated by query_law_pro.py (5002).
+✅ In-memory (law, section) index built at startup, refreshed by file mtime.
+✅ Cached TOC pages with ETag / Last-Modified revalidation.
+✅ Template compiled once; paginated TOC, streamed full TOC, gzip/brotli.
+✅ /search?law=...&q=... ranks sections by body text (per-Act BM25 slice).
 """
 
-from flask import Flask, request, render_template_string
-import os, json
+from flask import Flask, Response, request, make_response, stream_with_context, jsonify
+from markupsafe import escape
+import os, re, json, bisect, hashlib, threading, time, zlib, gzip
+
+from lexical import tokenize, InvertedIndex
+
+try:
+    import brotli  # optional: only used when the client accepts "br"
+except ImportError:
+    brotli = None
 
 # --------------------------------------------------------------------
 # Path to structured law JSONs
 # --------------------------------------------------------------------
-LAW_DIR = r"C:\wamp64\www\paklaw_codebase\pakistan_code_structured"
+LAW_DIR = os.getenv("PAKLAW_LAW_DIR", r"C:\wamp64\www\paklaw_codebase\pakistan_code_structured")
+REFRESH_SECS = 5       # how often the watcher re-stats LAW_DIR for changed files
+TOC_PAGE_SIZE = 100    # sections per TOC page (?page=all streams the whole Act)
+MIN_COMPRESS = 1024    # don't bother compressing tiny responses
+STREAM_CHUNK = 16384   # bytes buffered per chunk when streaming a full TOC
+SEARCH_LIMIT = 20      # max sections returned by /search
+SNIPPET_CHARS = 220    # length of the highlighted body excerpt
 
 # Initialize Flask
 app = Flask(__name__)
@@ -40,23 +58,59 @@ PAGE_TEMPLATE = """
         background:#222; color:#fff; font-size:16px; margin-bottom:15px;
     }
     li { line-height:1.6; }
+    mark { background:#ffc107; color:#000; }
+    #results li { margin-bottom:8px; }
+    #results small { color:#bbb; }
+    .pager { margin:15px 0; }
+    .pager a, .pager span { margin-right:10px; }
 </style>
 <script>
+let searchTimer = null;
 function filterTOC() {
     let q = document.getElementById("searchBox").value.toLowerCase();
     let sections = document.querySelectorAll(".toc li");
     sections.forEach(li => {
         li.style.display = li.innerText.toLowerCase().includes(q) ? "" : "none";
     });
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => searchBodies(q), 150);
+}
+function esc(s) {
+    return String(s).replace(/[&<>"']/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"})[c]);
+}
+function searchBodies(q) {
+    let box = document.getElementById("results");
+    if (q.trim().length < 2) { box.innerHTML = ""; return; }
+    let law = document.body.dataset.law;
+    fetch(`/search?law=${encodeURIComponent(law)}&q=${encodeURIComponent(q)}`)
+        .then(r => r.json())
+        .then(j => {
+            if (document.getElementById("searchBox").value.toLowerCase() !== q) return;
+            box.innerHTML = j.results.length ? "<h3>🔎 Matches in section text</h3><ul>" + j.results.map(r =>
+                `<li><a href="/view?law=${encodeURIComponent(law)}&section=${encodeURIComponent(r.section_no)}">` +
+                // section_title and snippet come escaped by the server; section_no is raw (it is also the link key)
+                `§${esc(r.section_no)} — ${r.section_title}</a><br><small>${r.snippet}</small></li>`
+            ).join("") + "</ul>" : "";
+        });
 }
 </script>
 </head>
-<body>
+<body data-law="{{ law_name }}">
     <h1>{{ law_name.replace('_',' ') }}</h1>
 
     {% if toc %}
         <h2>📜 Table of Contents</h2>
         <input type="text" id="searchBox" onkeyup="filterTOC()" placeholder="🔍 Search within this Act...">
+        <div id="results"></div>
+        {% if pages > 1 %}
+        <div class="pager">
+            {% for p in range(1, pages + 1) %}
+                {% if p == page %}<span>[{{ p }}]</span>
+                {% else %}<a href="/view?law={{ law_name }}&page={{ p }}">{{ p }}</a>{% endif %}
+            {% endfor %}
+            <a href="/view?law={{ law_name }}&page=all">All sections</a>
+        </div>
+        {% endif %}
         <div class="toc">
             {% for ch in toc %}
                 <h3>{{ ch.chapter_title }}</h3>
@@ -83,6 +137,199 @@ function filterTOC() {
 </html>
 """
 
+PAGE = app.jinja_env.from_string(PAGE_TEMPLATE)  # compiled once, reused per request
+
+# --------------------------------------------------------------------
+# In-memory law index (slug → parsed Act, (slug, section_no) → body)
+# --------------------------------------------------------------------
+def load_law(path, slug):
+    """Parse one law JSON into its TOC and a section_no → body map."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "chapters" in data:
+        toc = [{"chapter_title": ch.get("chapter_title", "Untitled Chapter"),
+                "sections": ch.get("sections", [])}
+               for ch in data["chapters"]]
+    elif "sections" in data:
+        toc = [{"chapter_title": data.get("law_name", slug),
+                "sections": data["sections"]}]
+    else:
+        toc = None
+
+    sections, flat = {}, []
+    for ch in toc or []:
+        for sec in ch["sections"]:
+            flat.append((ch["chapter_title"], sec))
+            key = str(sec.get("section_no"))
+            if key not in sections:  # first match wins, as in the old linear scan
+                sections[key] = sec.get("body") or sec.get("text")
+    # Per-Act slice of the lexical index: one document per TOC entry
+    lex = InvertedIndex([tokenize(f"{sec.get('section_title', '')} {sec.get('body') or sec.get('text') or ''}")
+                         for _, sec in flat])
+    return {"toc": toc, "flat": flat, "sections": sections, "lex": lex,
+            "pages": max(1, -(-len(flat) // TOC_PAGE_SIZE))}
+
+
+def toc_page(entry, page):
+    """Regroup the `page`-th slice of the flattened TOC back into chapters."""
+    start = (page - 1) * TOC_PAGE_SIZE
+    toc = []
+    for title, sec in entry["flat"][start:start + TOC_PAGE_SIZE]:
+        if not toc or toc[-1]["chapter_title"] != title:
+            toc.append({"chapter_title": title, "sections": []})
+        toc[-1]["sections"].append(sec)
+    return toc
+
+
+class LawIndex:
+    """
+    Hashed index over LAW_DIR keyed by normalized (lower-case) file slug.
+    Only files whose mtime changed are re-parsed on refresh; the tables are
+    rebuilt and swapped in as one (laws, slugs) snapshot, which readers take
+    once per lookup, so they never need a lock or see a half-swapped pair.
+    """
+
+    def __init__(self, law_dir):
+        self.law_dir = law_dir
+        # (slug → {"file", "mtime", "etag", "toc", "sections"} or {"error"}, sorted slugs for prefix lookups)
+        self.snapshot = ({}, [])
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            try:
+                entries = [e for e in os.scandir(self.law_dir)
+                           if e.name.endswith(".json") and e.is_file()]
+            except OSError as e:
+                print(f"⚠️ Cannot scan {self.law_dir}: {e}")
+                return
+
+            current, _ = self.snapshot
+            laws, changed = {}, 0
+            for e in entries:
+                slug = e.name[:-5].lower()
+                mtime = e.stat().st_mtime
+                old = current.get(slug)
+                if old and old["file"] == e.name and old["mtime"] == mtime:
+                    laws[slug] = old
+                    continue
+                entry = {"file": e.name, "mtime": mtime,
+                         "etag": hashlib.md5(f"{e.name}:{mtime}".encode()).hexdigest()}
+                try:
+                    entry.update(load_law(e.path, e.name[:-5]))
+                except Exception as ex:
+                    entry["error"] = str(ex)
+                laws[slug] = entry
+                changed += 1
+
+            if changed or len(laws) != len(current):
+                self.snapshot = (laws, sorted(laws))
+                TOC_CACHE.clear()
+
+    def watch(self, interval):
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.refresh()
+        threading.Thread(target=loop, name="law-index-watch", daemon=True).start()
+
+    def find(self, law):
+        """Exact slug match, else the first slug starting with `law` (case-insensitive)."""
+        key = law.lower()
+        laws, slugs = self.snapshot
+        if key in laws:
+            return key, laws[key]
+        i = bisect.bisect_left(slugs, key)
+        if i < len(slugs) and slugs[i].startswith(key):
+            return slugs[i], laws[slugs[i]]
+        return None, None
+
+
+TOC_CACHE = {}  # (slug, etag, page, encoding) → rendered (and compressed) TOC bytes
+TEMPLATE_TAG = hashlib.md5(PAGE_TEMPLATE.encode("utf-8")).hexdigest()[:8]
+
+LAWS = LawIndex(LAW_DIR)
+LAWS.refresh()
+LAWS.watch(REFRESH_SECS)
+
+
+# --------------------------------------------------------------------
+# Compression + validators
+# --------------------------------------------------------------------
+def pick_encoding():
+    """Negotiate br > gzip > identity from Accept-Encoding."""
+    accepted = request.accept_encodings
+    if brotli and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return "identity"
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def stream_compress(chunks, encoding):
+    """Re-chunk a text generator into ~STREAM_CHUNK pieces, compressing on the fly."""
+    if encoding == "br":
+        comp = brotli.Compressor(quality=5)
+        feed, flush = comp.process, comp.finish
+    elif encoding == "gzip":
+        comp = zlib.compressobj(6, zlib.DEFLATED, 31)
+        feed, flush = (lambda b: comp.compress(b) + comp.flush(zlib.Z_SYNC_FLUSH)), comp.flush
+    else:
+        feed, flush = (lambda b: b), (lambda: b"")
+
+    buf, size = [], 0
+    for piece in chunks:
+        buf.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK:
+            yield feed("".join(buf).encode("utf-8"))
+            buf, size = [], 0
+    yield feed("".join(buf).encode("utf-8")) + flush()
+
+
+def etag_for(entry, encoding):
+    return f"{entry['etag']}-{TEMPLATE_TAG}-{encoding}"
+
+
+def not_modified(entry, encoding):
+    """Short-circuit with a 304 before rendering anything."""
+    if request.if_none_match.contains(etag_for(entry, encoding)):
+        return finish(make_response("", 304), entry, encoding)
+    return None
+
+
+def finish(resp, entry, encoding, applied=None):
+    """
+    Attach validators so browsers revalidate cheaply. The ETag follows the
+    negotiated encoding; Content-Encoding follows what was actually applied
+    (tiny bodies are sent uncompressed).
+    """
+    applied = encoding if applied is None else applied
+    resp.set_etag(etag_for(entry, encoding))
+    resp.last_modified = entry["mtime"]
+    resp.cache_control.no_cache = True
+    resp.vary.add("Accept-Encoding")
+    if applied != "identity" and resp.status_code == 200:
+        resp.headers["Content-Encoding"] = applied
+    return resp
+
+
+def encode(html, encoding):
+    """Compress html for `encoding`; returns (body, applied_encoding)."""
+    data = html.encode("utf-8")
+    if len(data) < MIN_COMPRESS:
+        return data, "identity"
+    return compress(data, encoding), encoding
+
 # --------------------------------------------------------------------
 # Route to display a law file and section
 # --------------------------------------------------------------------
@@ -95,68 +342,109 @@ def view_law():
         return "⚠️ Missing 'law' parameter", 400
 
     # Find matching JSON file (case-insensitive)
-    possible_files = [f for f in os.listdir(LAW_DIR)
-                      if f.lower().startswith(law.lower()) and f.endswith(".json")]
-    if not possible_files:
+    slug, entry = LAWS.find(law)
+    if not entry:
         return f"❌ No file found for law: {law}", 404
+    if "error" in entry:
+        return f"❌ Error reading file: {entry['error']}", 500
 
-    path = os.path.join(LAW_DIR, possible_files[0])
-
-    # Load JSON safely
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
-        return f"❌ Error reading file: {e}", 500
+    encoding = pick_encoding()
+    unchanged = not_modified(entry, encoding)
+    if unchanged:
+        return unchanged
 
     # --- No section parameter → show TOC ---
     if not section:
-        toc = []
-        if "chapters" in data:
-            for ch in data["chapters"]:
-                toc.append({
-                    "chapter_title": ch.get("chapter_title", "Untitled Chapter"),
-                    "sections": ch.get("sections", [])
-                })
-        elif "sections" in data:
-            toc.append({
-                "chapter_title": data.get("law_name", law),
-                "sections": data["sections"]
-            })
-        else:
-            toc = None
-
-        return render_template_string(
-            PAGE_TEMPLATE,
-            law_name=law,
-            toc=toc,
-            section_no=None,
-            section_text=None
-        )
+        law_name = entry["file"][:-5]
+        page = request.args.get("page", "1")
+
+        # Full TOC: stream it in chunks instead of buffering the whole Act
+        if page == "all":
+            chunks = PAGE.generate(law_name=law_name, toc=entry["toc"], page=0,
+                                   pages=entry["pages"], section_no=None, section_text=None)
+            resp = Response(stream_with_context(stream_compress(chunks, encoding)),
+                            mimetype="text/html")
+            return finish(resp, entry, encoding)
+
+        page = min(max(int(page) if page.isdigit() else 1, 1), entry["pages"])
+        key = (slug, entry["etag"], page, encoding)
+        cached = TOC_CACHE.get(key)
+        if cached is None:
+            cached = TOC_CACHE[key] = encode(PAGE.render(
+                law_name=law_name,
+                toc=toc_page(entry, page) if entry["toc"] else None,
+                page=page,
+                pages=entry["pages"],
+                section_no=None,
+                section_text=None
+            ), encoding)
+        body, applied = cached
+        return finish(make_response(body), entry, encoding, applied)
 
     # --- Render a specific section ---
-    section_text = None
-    if "chapters" in data:
-        for ch in data["chapters"]:
-            for sec in ch.get("sections", []):
-                if str(sec.get("section_no")) == str(section):
-                    section_text = sec.get("body") or sec.get("text")
-                    break
-            if section_text:
-                break
-    elif "sections" in data:
-        for sec in data["sections"]:
-            if str(sec.get("section_no")) == str(section):
-                section_text = sec.get("body") or sec.get("text")
-                break
+    section_text = entry["sections"].get(str(section))
 
-    return render_template_string(
-        PAGE_TEMPLATE,
+    body, applied = encode(PAGE.render(
         law_name=law,
         section_no=section,
         section_text=section_text or "No text found for this section.",
         toc=None
-    )
+    ), encoding)
+    return finish(make_response(body), entry, encoding, applied)
+
+# --------------------------------------------------------------------
+# Full-text search inside one Act
+# --------------------------------------------------------------------
+def snippet(text, terms):
+    """Excerpt around the first query-term hit with <mark> highlighting (HTML-escaped)."""
+    text = re.sub(r"\s+", " ", text or "")
+    if not terms:
+        return str(escape(text[:SNIPPET_CHARS]))
+    pat = re.compile(r"\b(" + "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)) + r")\b", re.I)
+    m = pat.search(text)
+    start = max(0, m.start() - SNIPPET_CHARS // 3) if m else 0
+    part = text[start:start + SNIPPET_CHARS]
+    out, last = [], 0
+    for m in pat.finditer(part):
+        out.append(str(escape(part[last:m.start()])))
+        out.append(f"<mark>{escape(m.group(0))}</mark>")
+        last = m.end()
+    out.append(str(escape(part[last:])))
+    return ("…" if start else "") + "".join(out) + ("…" if start + SNIPPET_CHARS < len(text) else "")
+
+
+@app.route("/search")
+def search_law():
+    t0 = time.perf_counter()
+    law = request.args.get("law")
+    q = request.args.get("q", "")
+    if not law:
+        return jsonify({"error": "Missing 'law' parameter"}), 400
+
+    slug, entry = LAWS.find(law)
+    if not entry:
+        return jsonify({"error": f"No file found for law: {law}"}), 404
+    if "error" in entry:
+        return jsonify({"error": f"Error reading file: {entry['error']}"}), 500
+
+    lex = entry["lex"]
+    terms = tokenize(q)
+    # Search-as-you-type: the last word may be incomplete, so expand it as a prefix
+    if terms and not q[-1:].isspace():
+        terms = terms[:-1] + (lex.expand_prefix(terms[-1]) or [terms[-1]])
+
+    ids, scores = lex.top(terms, SEARCH_LIMIT)
+    results = []
+    for i, score in zip(ids.tolist(), scores.tolist()):
+        _, sec = entry["flat"][i]
+        results.append({
+            "section_no": str(sec.get("section_no")),
+            "section_title": str(escape(sec.get("section_title", ""))),
+            "score": round(score, 3),
+            "snippet": snippet(sec.get("body") or sec.get("text"), terms),
+        })
+    return jsonify({"law": entry["file"][:-5], "q": q, "results": results,
+                    "took_ms": round((time.perf_counter() - t0) * 1000, 2)})
 
 # --------------------------------------------------------------------
 # Run local server
@@ -0,0 +1,51 @@
+"""Citation fast path (scripts/citations.py): only unambiguous, fully resolved citations are lookups."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from citations import CitationIndex  # noqa: E402
+
+
+def row(law, file, section_no):
+    return {"law": law, "file": file, "section_no": section_no, "text": f"{law} §{section_no}"}
+
+
+META = [
+    row("The Arms Act (1878)", "The_Arms_Act_1878", "5"),
+    row("The Arms Act (1878)", "The_Arms_Act_1878", "7"),
+    row("The Arms Act (1878)", "The_Arms_Act_1878", "25"),
+    row("Banking Companies Ordinance (1962)", "Banking_Companies_Ordinance_1962", "2"),
+    row("Banking Companies Ordinance (1962)", "Banking_Companies_Ordinance_1962", "3A"),
+    row("Cantonments Rent Restriction Act (1963)", "Cantonments_Rent_Restriction_Act_1963", "7"),
+    row("Cantonments Rent Restriction Act (1963)", "Cantonments_Rent_Restriction_Act_1963", "25"),
+    row("COMSATS Institute of Information Technology Ordinance (2000)", "COMSATS_Ordinance_2000", "2"),
+    row("COMSATS Institute of Information Technology Ordinance (2000)", "COMSATS_Ordinance_2000", "7"),
+    row("THE TRANSFER OF PROPERTY ACT (1882)", "THE_TRANSFER_OF_PROPERTY_ACT_1882", "54"),
+]
+INDEX = CitationIndex(META, {"ATA": "Anti-Terrorism Act", "TPA": "Transfer of Property Act"})
+
+
+def rows(query):
+    found = INDEX.parse(query)
+    return None if found is None else [(META[i]["file"], META[i]["section_no"]) for i in found]
+
+
+def test_unindexed_act_alias_falls_through():
+    assert rows("section 7 ATA") is None
+
+
+def test_unresolved_act_name_falls_through():
+    assert rows("Companies Act 2017 section 2") is None
+
+
+def test_ambiguous_unscoped_section_falls_through():
+    assert rows("Article 25") is None
+
+
+def test_resolved_citations():
+    assert rows("s. 5 Arms Act 1878") == [("The_Arms_Act_1878", "5")]
+    assert rows("section 3A of the Banking Companies Ordinance") == [("Banking_Companies_Ordinance_1962", "3A")]
+    assert rows("54 TPA") == [("THE_TRANSFER_OF_PROPERTY_ACT_1882", "54")]
+    assert rows("what is section 3-A") == [("Banking_Companies_Ordinance_1962", "3A")]